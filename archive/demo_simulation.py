@@ -21,10 +21,11 @@ Author: Quantitative Portfolio Engineering Team
 """
 
 import time
-import logging
 import datetime
 from typing import List, Dict, Any
 
+import numpy as np
+
 # Phase 1 Import (Data Ingestion)
 import opportunity_scanner
 
@@ -32,8 +33,8 @@ import opportunity_scanner
 # SINGLE SOURCE OF TRUTH ENFORCEMENT
 from volatility_metrics import compute_atr, classify_volatility_state
 
-# Configure logging to suppress noisy output during demo
-logging.basicConfig(level=logging.ERROR)
+# Position sets at least this large are summarized with NumPy
+NUMPY_MIN_POSITIONS = 64
 
 # =============================================================================
 # PHASE 2 SIGNAL UTILITIES (Pure Computation - No Decisions)
@@ -46,7 +47,8 @@ def compute_news_sentiment(news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {"score": 0.0, "bias": "NEUTRAL", "item_count": 0}
     
     try:
-        sentiments = [float(item.get("sentiment", 0.0)) for item in news_items]
+        _float = float
+        sentiments = [_float(item.get("sentiment", 0.0)) for item in news_items]
         avg_sentiment = sum(sentiments) / len(sentiments)
         
         if avg_sentiment > 0.2:
@@ -75,16 +77,52 @@ def compute_position_vitals_summary(positions: List[Dict[str, Any]]) -> Dict[str
         }
     
     try:
-        scores = [float(p.get("vitals_score", 50.0)) for p in positions]
-        healthy = sum(1 for s in scores if s >= 60)
-        weak = sum(1 for s in scores if 40 <= s < 60)
-        unhealthy = sum(1 for s in scores if s < 40)
+        if len(positions) >= NUMPY_MIN_POSITIONS:
+            scores = np.fromiter(
+                (float(p.get("vitals_score", 50.0)) for p in positions),
+                dtype=np.float64,
+                count=len(positions)
+            )
+            # Two masks cover all three buckets: weak = (>= 40) - (>= 60)
+            healthy = int(np.count_nonzero(scores >= 60))
+            weak = int(np.count_nonzero(scores >= 40)) - healthy
+            return {
+                "count": len(positions),
+                "avg_vitals": round(float(scores.mean()), 2),
+                "min_vitals": round(float(scores.min()), 2),
+                "max_vitals": round(float(scores.max()), 2),
+                "healthy_count": healthy,
+                "weak_count": weak,
+                "unhealthy_count": scores.size - healthy - weak
+            }
+        
+        # Single pass: accumulate total, min/max and health buckets together
+        _float = float
+        n = 0
+        total = 0.0
+        mn = _float("inf")
+        mx = _float("-inf")
+        healthy = weak = unhealthy = 0
+        for p in positions:
+            s = _float(p.get("vitals_score", 50.0))
+            n += 1
+            total += s
+            if s < mn:
+                mn = s
+            if s > mx:
+                mx = s
+            if s >= 60:
+                healthy += 1
+            elif s >= 40:
+                weak += 1
+            else:
+                unhealthy += 1
         
         return {
-            "count": len(positions),
-            "avg_vitals": round(sum(scores) / len(scores), 2),
-            "min_vitals": round(min(scores), 2),
-            "max_vitals": round(max(scores), 2),
+            "count": n,
+            "avg_vitals": round(total / n, 2),
+            "min_vitals": round(mn, 2),
+            "max_vitals": round(mx, 2),
             "healthy_count": healthy,
             "weak_count": weak,
             "unhealthy_count": unhealthy
@@ -201,21 +239,28 @@ def main():
     
     real_candles = []
     using_mock = False
+    using_stale = False
     
     try:
         print("    Attempting to fetch XLK candles from Polygon API...")
-        real_candles = opportunity_scanner.fetch_tech_sector_candles(limit=20)
+        real_candles = opportunity_scanner.cached_fetch_tech_sector_candles(limit=20)
         
         if real_candles:
             print(f"    ✅ Success: Fetched {len(real_candles)} live candles.")
         else:
             print("    ⚠️  API returned no data (likely no API key set).")
-            print("    👉 Switching to MOCK DATA for simulation.")
-            using_mock = True
     except Exception as e:
         print(f"    ❌ Error during ingestion: {e}")
-        print("    👉 Switching to MOCK DATA for simulation.")
-        using_mock = True
+    
+    if not real_candles:
+        # Prefer last-known real candles over mock data during an outage
+        real_candles = opportunity_scanner.load_stale_tech_sector_candles(limit=20)
+        if real_candles:
+            print(f"    🕒 Using {len(real_candles)} last-known candles from stale cache.")
+            using_stale = True
+        else:
+            print("    👉 Switching to MOCK DATA for simulation.")
+            using_mock = True
         
     print_separator()
 
@@ -248,7 +293,7 @@ def main():
     sentiment = compute_news_sentiment(generate_mock_news("neutral")) 
     vitals = compute_position_vitals_summary(generate_mock_positions("mixed"))
     
-    print_phase2_signals("CURRENT", atr, vol_state, sentiment, vitals)
+    print_phase2_signals("CURRENT (STALE)" if using_stale else "CURRENT", atr, vol_state, sentiment, vitals)
     
     # Run High Volatility Mock Scenario to prove logic handles it
     print("\n>>> SCENARIO 2: [Mock] High Volatility Stress Test")
@@ -274,4 +319,6 @@ def main():
     print("=" * 60 + "\n")
 
 if __name__ == "__main__":
+    # Suppress noisy output during demo
+    opportunity_scanner.configure_logging()
     main()
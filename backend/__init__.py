@@ -0,0 +1 @@
+"""Backend API package (Flask app, routes, market status, scenarios)."""
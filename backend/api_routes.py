@@ -18,12 +18,20 @@ Living AI Agent Features:
 import sys
 import os
 import json
+import logging
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Add parent directory to path to import project modules
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(_BACKEND_DIR))
 
-from flask import Blueprint, jsonify, request
+import orjson
+from flask import Blueprint, Response, jsonify, request
 
 # Import the market-aware data router
 from data_router import (
@@ -40,53 +48,122 @@ from historical_data_service import (
 )
 
 # Import the decision engine runner
-from market_aware_runner import run_market_aware_analysis
+from market_aware_runner import run_market_aware_analysis, clear_analysis_cache
 
 api = Blueprint("api", __name__)
+log = logging.getLogger(__name__)
 
 # =============================================================================
 # AGENT MEMORY (UPGRADE 1)
 # =============================================================================
 
-MEMORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_memory.json")
+MEMORY_FILE = os.path.join(_BACKEND_DIR, "agent_memory.json")
+
+# Default memory structure (read-only; copy before use)
+DEFAULT_MEMORY = MappingProxyType({"last_run": None})
+
+# Set once ensure_memory_file() has confirmed the file exists
+_MEMORY_READY = False
 
-# Default memory structure
-DEFAULT_MEMORY = {"last_run": None}
+# In-process memory cache (populated on first load, written through on save)
+_MEMORY_CACHE = None
+_MEMORY_LOCK = threading.Lock()
+
+# Pre-serialized /health body; rebuilt whenever agent memory changes.
+# The timestamp is spliced in per request via the placeholder.
+_HEALTH_TIMESTAMP = b"__HEALTH_TIMESTAMP__"
+_HEALTH_JSON = b""
+
+# Risk ordering for trend computation; _RISK_TRENDS is indexed by
+# (diff > 0) + 2 * (diff < 0)
+_RISK_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+_RISK_TRENDS = ("STABLE", "RISK_INCREASING", "RISK_DECREASING")
 
 
 def ensure_memory_file():
-    """Ensure memory file exists with valid structure."""
+    """Ensure memory file exists with valid structure (checked once per process)."""
+    global _MEMORY_READY
+    if _MEMORY_READY:
+        return
     if not os.path.exists(MEMORY_FILE):
         try:
             with open(MEMORY_FILE, "w") as f:
-                json.dump(DEFAULT_MEMORY, f, indent=2)
+                json.dump(dict(DEFAULT_MEMORY), f, indent=2)
             print(f"✅ Created agent memory file: {MEMORY_FILE}")
         except Exception as e:
             print(f"⚠️ Could not create memory file: {e}")
+            return
+    _MEMORY_READY = True
 
 
 def load_agent_memory() -> dict:
-    """Load previous run memory from persistent storage."""
-    ensure_memory_file()
-    try:
-        with open(MEMORY_FILE, "r") as f:
-            data = json.load(f)
-            # Validate structure
-            if "last_run" not in data:
-                return DEFAULT_MEMORY
-            return data
-    except Exception as e:
-        print(f"⚠️ Failed to load agent memory: {e}")
-    return DEFAULT_MEMORY
+    """
+    Load previous run memory.
+
+    The file is read once per process; afterwards the in-process cache
+    is authoritative and returned as a shallow copy.
+    """
+    global _MEMORY_CACHE
+    if _MEMORY_CACHE is not None:
+        return dict(_MEMORY_CACHE)
+    
+    with _MEMORY_LOCK:
+        if _MEMORY_CACHE is None:
+            try:
+                with open(MEMORY_FILE, "r") as f:
+                    data = json.load(f)
+                # Validate structure
+                data.setdefault("last_run", None)
+            except Exception as e:
+                print(f"⚠️ Failed to load agent memory: {e}")
+                data = dict(DEFAULT_MEMORY)
+            _MEMORY_CACHE = data
+    return dict(_MEMORY_CACHE)
 
 
 def save_agent_memory(memory: dict):
-    """Persist current run to memory file."""
-    try:
-        with open(MEMORY_FILE, "w") as f:
-            json.dump(memory, f, indent=2)
-    except Exception as e:
-        print(f"⚠️ Failed to save agent memory: {e}")
+    """
+    Update the memory cache and persist it.
+
+    Only writes when last_run changed. The write is synchronous (it is one
+    small file) and happens under the lock, so concurrent saves land in order.
+    """
+    global _MEMORY_CACHE
+    with _MEMORY_LOCK:
+        if _MEMORY_CACHE is not None and _MEMORY_CACHE.get("last_run") == memory.get("last_run"):
+            return
+        _MEMORY_CACHE = dict(memory)
+        _build_health_json(memory)
+        try:
+            # Write to a temp file and swap so readers never see a partial file
+            tmp_file = MEMORY_FILE + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(memory, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_file, MEMORY_FILE)
+        except Exception as e:
+            print(f"⚠️ Failed to save agent memory: {e}")
+
+
+def _build_health_json(memory: dict):
+    """Re-serialize the /health body for the given memory state."""
+    global _HEALTH_JSON
+    last_run = memory.get("last_run")
+    _HEALTH_JSON = orjson.dumps({
+        "status": "OK",
+        "service": "Portfolio Intelligence System",
+        "version": "2.0.0-market-aware",
+        "agent": {
+            "memory_enabled": _MEMORY_READY,
+            "has_previous_run": last_run is not None,
+            "last_posture": last_run.get("market_posture") if last_run else None,
+            "last_risk": last_run.get("risk_level") if last_run else None
+        },
+        "timestamp": _HEALTH_TIMESTAMP.decode()
+    })
+
+
+ensure_memory_file()
+_build_health_json(load_agent_memory())
 
 
 def compute_risk_trend(previous_risk: str, current_risk: str) -> str:
@@ -96,25 +173,64 @@ def compute_risk_trend(previous_risk: str, current_risk: str) -> str:
     Returns:
         RISK_INCREASING, RISK_DECREASING, or STABLE
     """
-    risk_order = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
-    prev_val = risk_order.get(previous_risk, 1)
-    curr_val = risk_order.get(current_risk, 1)
-    
-    if curr_val > prev_val:
-        return "RISK_INCREASING"
-    elif curr_val < prev_val:
-        return "RISK_DECREASING"
-    return "STABLE"
+    diff = _RISK_ORDER.get(current_risk, 1) - _RISK_ORDER.get(previous_risk, 1)
+    return _RISK_TRENDS[(diff > 0) + 2 * (diff < 0)]
+
+
+# =============================================================================
+# REQUEST HELPERS
+# =============================================================================
+
+def _json_body() -> dict:
+    """
+    Decode the JSON request body with orjson.
+
+    An empty body decodes to {}. Raises orjson.JSONDecodeError
+    (a ValueError) on malformed input.
+    """
+    return orjson.loads(request.get_data(cache=False) or b"{}")
+
+
+# Formatted timestamp, reused for every call within the same second.
+_ISO_CACHE = {"second": 0, "text": ""}
+
+
+def _iso_now() -> str:
+    """Current local time as an ISO string, at one-second resolution."""
+    now = int(time.time())
+    if now != _ISO_CACHE["second"]:
+        _ISO_CACHE["text"] = datetime.fromtimestamp(now).isoformat()
+        _ISO_CACHE["second"] = now
+    return _ISO_CACHE["text"]
+
+
+def _fail(message: str, code: int = 500) -> Response:
+    """Build the standard {"error", "status": "FAILED"} error response."""
+    return Response(
+        b'{"error":%s,"status":"FAILED"}' % orjson.dumps(message),
+        status=code,
+        mimetype="application/json"
+    )
 
 
 # =============================================================================
 # MARKET STATUS & DATA ROUTING
 # =============================================================================
 
-@api.route("/status", methods=["GET"])
-def get_status():
+# Serialized /status body, reused for STATUS_CACHE_TTL seconds.
+# Invalidated by any endpoint that changes the routing selection.
+STATUS_CACHE_TTL = 5.0
+_STATUS_CACHE = {"body": None, "ts": 0.0}
+
+
+def _invalidate_status_cache():
+    """Drop the cached /status body."""
+    _STATUS_CACHE["body"] = None
+
+
+def _status_json() -> bytes:
     """
-    Get current market status and data routing configuration.
+    Serialized current market status and data routing configuration.
     
     Returns:
         - market_status: OPEN or CLOSED
@@ -126,14 +242,13 @@ def get_status():
         - selected_time_range: Current time range
         - controls_enabled: Which UI controls are active
     """
-    try:
-        config = get_routing_config()
-        return jsonify(config)
-    except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+    now = time.monotonic()
+    body = _STATUS_CACHE["body"]
+    if body is None or now - _STATUS_CACHE["ts"] >= STATUS_CACHE_TTL:
+        body = orjson.dumps(get_routing_config())
+        _STATUS_CACHE["body"] = body
+        _STATUS_CACHE["ts"] = now
+    return body
 
 
 @api.route("/set-symbol", methods=["POST"])
@@ -151,28 +266,20 @@ def set_symbol():
         Updated routing configuration
     """
     try:
-        data = request.get_json()
+        data = _json_body()
         symbol = data.get("symbol")
         
         if not symbol:
-            return jsonify({
-                "error": "Symbol is required",
-                "status": "FAILED"
-            }), 400
+            return _fail("Symbol is required", 400)
         
         router = get_data_router()
         config = router.set_symbol(symbol)
+        _invalidate_status_cache()
         return jsonify(config)
     except ValueError as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 400
+        return _fail(str(e), 400)
     except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+        return _fail(str(e))
 
 
 @api.route("/set-time-range", methods=["POST"])
@@ -190,75 +297,94 @@ def set_time_range():
         Updated routing configuration
     """
     try:
-        data = request.get_json()
+        data = _json_body()
         time_range = data.get("time_range")
         
         if not time_range:
-            return jsonify({
-                "error": "Time range is required",
-                "status": "FAILED"
-            }), 400
+            return _fail("Time range is required", 400)
         
         router = get_data_router()
         config = router.set_time_range(time_range)
+        _invalidate_status_cache()
         return jsonify(config)
     except ValueError as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 400
+        return _fail(str(e), 400)
     except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+        return _fail(str(e))
 
 
-@api.route("/available-symbols", methods=["GET"])
-def available_symbols():
-    """
-    Get list of available symbols for historical analysis.
-    
-    Returns:
-        { "symbols": ["SPY", "QQQ", "IWM", ...] }
-    """
-    try:
-        symbols = get_available_symbols()
-        return jsonify({
-            "symbols": symbols,
-            "count": len(symbols)
-        })
-    except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+@lru_cache(maxsize=1)
+def _symbols_json() -> bytes:
+    """Serialized /available-symbols payload (static per process)."""
+    symbols = get_available_symbols()
+    return orjson.dumps({
+        "symbols": symbols,
+        "count": len(symbols)
+    })
 
 
-@api.route("/time-ranges", methods=["GET"])
-def time_ranges():
-    """
-    Get available time range options.
-    
-    Returns:
-        { "time_ranges": { "1M": {...}, "4M": {...}, ... } }
-    """
-    try:
-        ranges = get_time_ranges()
-        return jsonify({
-            "time_ranges": ranges
-        })
-    except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+@lru_cache(maxsize=1)
+def _time_ranges_json() -> bytes:
+    """Serialized /time-ranges payload (static per process)."""
+    return orjson.dumps({
+        "time_ranges": get_time_ranges()
+    })
+
+
+def _json_bytes_view(getter):
+    """Wrap a getter returning serialized JSON bytes as a GET view."""
+    def view():
+        try:
+            return Response(getter(), mimetype="application/json")
+        except Exception as e:
+            return _fail(str(e))
+    return view
+
+
+# Read-only metadata endpoints: (rule, endpoint, serialized-body getter)
+#   /status            → routing config (see _status_json)
+#   /available-symbols → { "symbols": ["SPY", "QQQ", "IWM", ...], "count": N }
+#   /time-ranges       → { "time_ranges": { "1M": {...}, "4M": {...}, ... } }
+_READ_ONLY_ROUTES = (
+    ("/status", "get_status", _status_json),
+    ("/available-symbols", "available_symbols", _symbols_json),
+    ("/time-ranges", "time_ranges", _time_ranges_json),
+)
+
+for _rule, _endpoint, _getter in _READ_ONLY_ROUTES:
+    api.add_url_rule(_rule, endpoint=_endpoint, view_func=_json_bytes_view(_getter), methods=["GET"])
 
 
 # =============================================================================
 # ANALYSIS ENDPOINTS
 # =============================================================================
 
+# Query-string values accepted as "true" for simulate_crash
+_TRUTHY = frozenset({"true", "True", "TRUE", "1", "yes", "on"})
+
+# Scenario values meaning "no scenario override"
+_NORMAL_SCENARIOS = frozenset({"NORMAL", ""})
+
+# Crash simulation inputs and the warning shown while it is active.
+# Shared across requests: treat as read-only.
+_CRASH_CONTEXT = {
+    "force_volatility_state": "EXPANDING",
+    "force_news_score": 10,
+    "force_sector_confidence": 20  # Force low confidence -> DEFENSIVE posture
+}
+_CRASH_WARNING = {
+    "type": "danger",
+    "message": "🚨 Market Crash Simulation Active — Volatility override engaged. All aggressive allocations blocked."
+}
+
+# Where /run reads its parameters from, keyed by HTTP method. Any other
+# method (Flask adds HEAD to GET routes) reads the query string like GET.
+_PARAM_SOURCES = {
+    "GET": lambda: request.args,
+    "POST": lambda: _json_body() or {},
+}
+
+
 @api.route("/run", methods=["GET", "POST"])
 def run_agent():
     """
@@ -278,20 +404,15 @@ def run_agent():
         simulate_crash: If true, forces defensive posture
     """
     try:
-        # Parse parameters from GET or POST
-        if request.method == "POST":
-            data = request.get_json() or {}
-            scenario = data.get("scenario")
-            symbol = data.get("symbol")
-            time_range = data.get("time_range")
-            simulate_crash = data.get("simulate_crash", False)
-        else:
-            scenario = request.args.get("scenario")
-            symbol = request.args.get("symbol")
-            time_range = request.args.get("time_range")
-            simulate_crash = request.args.get("simulate_crash", "false").lower() == "true"
+        # Parse parameters from GET (query string) or POST (JSON body)
+        params = _PARAM_SOURCES.get(request.method, _PARAM_SOURCES["GET"])()
+        scenario = params.get("scenario")
+        symbol = params.get("symbol")
+        time_range = params.get("time_range")
+        raw_crash = params.get("simulate_crash", False)
+        simulate_crash = raw_crash in _TRUTHY if isinstance(raw_crash, str) else bool(raw_crash)
         
-        if scenario == "NORMAL" or scenario == "":
+        if scenario in _NORMAL_SCENARIOS:
             scenario = None
         
         # =================================================================
@@ -308,12 +429,8 @@ def run_agent():
         # =================================================================
         crash_context = None
         if simulate_crash:
-            crash_context = {
-                "force_volatility_state": "EXPANDING",
-                "force_news_score": 10,
-                "force_sector_confidence": 20  # Force low confidence -> DEFENSIVE posture
-            }
-            print("🚨 [CRASH SIMULATION] Volatility override engaged")
+            crash_context = _CRASH_CONTEXT
+            log.warning("🚨 [CRASH SIMULATION] Volatility override engaged")
         
         # =================================================================
         # Run Market-Aware Analysis
@@ -324,6 +441,8 @@ def run_agent():
             time_range=time_range,
             crash_override=crash_context
         )
+        # symbol/time_range overrides may have changed the routing selection
+        _invalidate_status_cache()
         
         # =================================================================
         # UPGRADE 1: Compute Memory Insights
@@ -353,32 +472,26 @@ def run_agent():
             result["crash_simulation_active"] = True
             # Inject crash explanation into warnings
             if "analysis" in result:
-                if "warnings" not in result["analysis"]:
-                    result["analysis"]["warnings"] = []
-                result["analysis"]["warnings"].insert(0, {
-                    "type": "danger",
-                    "message": "🚨 Market Crash Simulation Active — Volatility override engaged. All aggressive allocations blocked."
-                })
+                result["analysis"].setdefault("warnings", []).insert(0, _CRASH_WARNING)
         
         # =================================================================
         # UPGRADE 1: Persist Current Run to Memory
         # =================================================================
         memory["last_run"] = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _iso_now(),
             "market_posture": current_posture,
             "risk_level": current_risk
         }
         save_agent_memory(memory)
         
+        # The app's orjson provider encodes eagerly, so serialization
+        # errors still reach _fail
         return jsonify(result)
+    except orjson.JSONDecodeError as e:
+        return _fail(f"Invalid JSON body: {e}", 400)
     except Exception as e:
-        import traceback
-        print(f"❌ API Execution Error: {e}")
-        traceback.print_exc()
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+        log.exception("❌ API Execution Error: %s", e)
+        return _fail(str(e))
 
 
 # =============================================================================
@@ -394,22 +507,8 @@ def health_check():
     This endpoint must NEVER fail.
     """
     try:
-        memory = load_agent_memory()
-        memory_enabled = os.path.exists(MEMORY_FILE)
-        last_run = memory.get("last_run")
-        
-        return jsonify({
-            "status": "OK",
-            "service": "Portfolio Intelligence System",
-            "version": "2.0.0-market-aware",
-            "agent": {
-                "memory_enabled": memory_enabled,
-                "has_previous_run": last_run is not None,
-                "last_posture": last_run.get("market_posture") if last_run else None,
-                "last_risk": last_run.get("risk_level") if last_run else None
-            },
-            "timestamp": datetime.now().isoformat()
-        })
+        body = _HEALTH_JSON.replace(_HEALTH_TIMESTAMP, _iso_now().encode())
+        return Response(body, mimetype="application/json")
     except Exception as e:
         # Health endpoint must NEVER fail
         return jsonify({
@@ -420,7 +519,7 @@ def health_check():
                 "memory_enabled": False,
                 "error": str(e)
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _iso_now()
         })
 
 
@@ -432,6 +531,10 @@ def reset_state():
     """
     try:
         reset_router()
+        clear_analysis_cache()
+        _invalidate_status_cache()
+        _symbols_json.cache_clear()
+        _time_ranges_json.cache_clear()
         config = get_routing_config()
         return jsonify({
             "status": "OK",
@@ -439,7 +542,4 @@ def reset_state():
             "config": config
         })
     except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "status": "FAILED"
-        }), 500
+        return _fail(str(e))
@@ -11,12 +11,60 @@ DEPLOYMENT:
 """
 
 import os
+import orjson
 from flask import Flask
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 from api_routes import api
 
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    Every jsonify() call in api_routes.py goes through this provider,
+    so the large /run analysis payload is serialized in C instead of
+    the stdlib json encoder.
+    """
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    # Same knobs as Flask's DefaultJSONProvider
+    sort_keys = False
+    compact = True
+
+    def _options(self) -> int:
+        option = self.OPTIONS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if not self.compact:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response (no str round-trip)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self._options()),
+            mimetype="application/json"
+        )
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app, origins="*")  # Allow all origins for deployment
+
+# Compress JSON responses (brotli preferred, gzip fallback)
+app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+Compress(app)
 app.register_blueprint(api)
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ Author: Quantitative Portfolio Engineering Team
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 
@@ -24,6 +25,13 @@ except ImportError:
 
 import requests
 
+# Multi-symbol bars: bars per page (Alpaca maximum) and pages followed
+BATCH_BARS_PAGE_LIMIT = 10000
+BATCH_BARS_MAX_PAGES = 10
+
+# Fields a Polygon aggregate record needs to become a candle
+_POLYGON_BAR_KEYS = frozenset(("t", "o", "h", "l", "c"))
+
 
 class AlpacaAdapter:
     """
@@ -213,20 +221,7 @@ class AlpacaAdapter:
         
         try:
             response = self._request(endpoint, base=self.data_url)
-            bars = response.get("bars", [])
-            
-            candles = []
-            for bar in bars[-limit:]:  # Take most recent
-                candles.append({
-                    "timestamp": bar.get("t"),
-                    "open": float(bar.get("o", 0)),
-                    "high": float(bar.get("h", 0)),
-                    "low": float(bar.get("l", 0)),
-                    "close": float(bar.get("c", 0)),
-                    "volume": int(bar.get("v", 0))
-                })
-            
-            return candles
+            return self._bars_to_candles(response.get("bars", []), limit)
             
         except RuntimeError as e:
             # _request wraps HTTP errors in RuntimeError. Check string for 403.
@@ -246,6 +241,111 @@ class AlpacaAdapter:
             print(f"[Alpaca] Error: Unexpected error fetching candles: {e}")
             return []
     
+    @staticmethod
+    def _bars_to_candles(bars: List[Dict], limit: int) -> List[Dict[str, Any]]:
+        """Convert Alpaca bar dicts to internal candles (most recent `limit`)."""
+        candles = []
+        for bar in bars[-limit:]:  # Take most recent
+            candles.append({
+                "timestamp": bar.get("t"),
+                "open": float(bar.get("o", 0)),
+                "high": float(bar.get("h", 0)),
+                "low": float(bar.get("l", 0)),
+                "close": float(bar.get("c", 0)),
+                "volume": int(bar.get("v", 0))
+            })
+        return candles
+    
+    def get_recent_candles_batch(
+        self,
+        symbols: List[str],
+        limit: int = 20,
+        timeframe: str = "1Day"
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch recent OHLCV bars for several symbols.
+        
+        Uses the multi-symbol bars endpoint, following next_page_token.
+        If that request fails, each symbol goes through get_recent_candles()
+        (and its Polygon fallback); so does any symbol that comes back with
+        fewer than `limit` bars.
+        
+        Args:
+            symbols: Stock symbols
+            limit: Number of bars per symbol
+            timeframe: '1Day', '1Hour', '1Min'
+            
+        Returns:
+            dict: {symbol: candle list}
+        """
+        if not symbols:
+            return {}
+        
+        end = datetime.now()
+        start = end - timedelta(days=self._bars_window_days(limit, timeframe))
+        
+        # Bars come back grouped by symbol, oldest first, and the page
+        # limit counts bars across all symbols, so every page is followed.
+        base_endpoint = (
+            f"/v2/stocks/bars"
+            f"?symbols={','.join(symbols)}"
+            f"&timeframe={timeframe}"
+            f"&start={start.strftime('%Y-%m-%d')}"
+            f"&end={end.strftime('%Y-%m-%d')}"
+            f"&limit={BATCH_BARS_PAGE_LIMIT}"
+        )
+        
+        bars_by_symbol = {symbol: [] for symbol in symbols}
+        incomplete = set()
+        page_token = None
+        try:
+            for _ in range(BATCH_BARS_MAX_PAGES):
+                endpoint = base_endpoint
+                if page_token:
+                    endpoint += f"&page_token={page_token}"
+                response = self._request(endpoint, base=self.data_url)
+                page = response.get("bars") or {}
+                for symbol, bars in page.items():
+                    if symbol in bars_by_symbol:
+                        bars_by_symbol[symbol].extend(bars)
+                page_token = response.get("next_page_token")
+                if not page_token:
+                    break
+            else:
+                # Page cap hit: symbols on the last page may be cut short
+                incomplete.update(page)
+        except RuntimeError as e:
+            print(f"[Alpaca] Note: Batch bars request failed ({e}). Fetching per symbol...")
+            return {
+                symbol: self.get_recent_candles(symbol, limit, timeframe)
+                for symbol in symbols
+            }
+        
+        # Symbols that came back short (or truncated) go through the
+        # single-symbol path and its Polygon fallback
+        return {
+            symbol: (
+                self._bars_to_candles(bars, limit)
+                if len(bars) >= limit and symbol not in incomplete
+                else self.get_recent_candles(symbol, limit, timeframe)
+            )
+            for symbol, bars in bars_by_symbol.items()
+        }
+    
+    @staticmethod
+    def _bars_window_days(limit: int, timeframe: str) -> int:
+        """
+        Calendar days to request so `limit` bars of `timeframe` are covered,
+        with a buffer for weekends and holidays.
+        """
+        unit = timeframe.lstrip("0123456789")
+        size = int(timeframe[:len(timeframe) - len(unit)] or 1)
+        if unit == "Min":
+            return (limit * size) // 390 + 5  # 390 minutes per regular session
+        if unit == "Hour":
+            return (limit * size) // 7 + 5
+        return (limit * size * 7) // 5 + 5  # trading days -> calendar days
+    
     def _fetch_polygon_fallback(self, symbol: str, limit: int) -> List[Dict[str, Any]]:
         """
         Attempts to fetch candles from Polygon.io as a backup.
@@ -272,7 +372,7 @@ class AlpacaAdapter:
             
             candles = []
             for r in results:
-                if all(k in r for k in ("t", "o", "h", "l", "c")):
+                if _POLYGON_BAR_KEYS <= r.keys():
                     candles.append({
                         "timestamp": r["t"], # Ms timestamp usually fine, or convert if needed
                         "open": float(r["o"]),
@@ -378,6 +478,26 @@ class AlpacaAdapter:
             list: Empty list
         """
         return []
+    
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch portfolio, positions, heatmap and candidates in one call.
+        
+        The two Alpaca round trips (account and positions) run
+        concurrently, so the snapshot costs one RTT instead of two.
+        
+        Returns:
+            dict: {"portfolio", "positions", "heatmap", "candidates"}
+        """
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            portfolio = pool.submit(self.get_portfolio)
+            positions = pool.submit(self.get_positions)
+            return {
+                "portfolio": portfolio.result(),
+                "positions": positions.result(),
+                "heatmap": self.get_sector_heatmap(),
+                "candidates": self.get_candidates()
+            }
 
 
 # Standalone validation
@@ -109,6 +109,23 @@ class MockAdapter:
         
         return candles
     
+    def get_recent_candles_batch(
+        self,
+        symbols: List[str],
+        limit: int = 20,
+        timeframe: str = "1Day"
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Returns mock candles for several symbols.
+        
+        Returns:
+            dict: {symbol: candle list}
+        """
+        return {
+            symbol: self.get_recent_candles(symbol, limit, timeframe)
+            for symbol in symbols
+        }
+    
     def get_candidates(self) -> List[Dict[str, Any]]:
         """
         Returns mock trade candidates.
@@ -154,6 +171,20 @@ class MockAdapter:
             "AI demand continues to outpace supply in hardware markets",
             "Utility sector stagnates as bond yields rise"
         ]
+    
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Returns portfolio, positions, heatmap and candidates together.
+        
+        Returns:
+            dict: {"portfolio", "positions", "heatmap", "candidates"}
+        """
+        return {
+            "portfolio": self.get_portfolio(),
+            "positions": self.get_positions(),
+            "heatmap": self.get_sector_heatmap(),
+            "candidates": self.get_candidates()
+        }
 
 
 # Standalone test
@@ -12,27 +12,60 @@ STRICT RULES:
 - NO demo/synthetic data
 """
 
-import os
-import sys
-from typing import Dict, Any, Optional, List
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
-# Ensure backend directory is in path for imports
-_backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
-if _backend_dir not in sys.path:
-    sys.path.insert(0, _backend_dir)
-
 # Import market status resolver
-from market_status import get_market_status
+from backend.market_status import get_market_status
 
 # Import data sources
 from historical_data_service import (
     get_historical_service,
     load_historical_data,
+    load_historical_data_batch,
     get_available_symbols,
     get_time_ranges
 )
 
+# Live broker adapter (resolved once; attribute looked up at construction time)
+try:
+    from broker import alpaca_adapter
+except Exception:
+    alpaca_adapter = None
+
+log = logging.getLogger(__name__)
+
+# Symbolic candidates used whenever live candidates are unavailable.
+# The decision engine needs SOMETHING to process.
+_HISTORICAL_CANDIDATES = (
+    {"symbol": "CANDIDATE_A", "sector": "TECH", "projected_efficiency": 70.0},
+    {"symbol": "CANDIDATE_B", "sector": "HEALTHCARE", "projected_efficiency": 65.0}
+)
+
+
+@lru_cache(maxsize=32)
+def _historical_sector_heatmap(symbol: str) -> Dict[str, int]:
+    """Sector heatmap for a historical symbol (deterministic per symbol)."""
+    return get_historical_service().generate_sector_heatmap(symbol)
+
+
+# Second-resolution ISO timestamp cache: (epoch second, iso string)
+_iso_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """Local ISO timestamp, formatted at most once per second."""
+    global _iso_cache
+    now = int(time.time())
+    if _iso_cache[0] != now:
+        _iso_cache = (now, datetime.fromtimestamp(now).isoformat())
+    return _iso_cache[1]
+
+
 # Data mode constants
 DATA_MODE_LIVE = "LIVE"
 DATA_MODE_HISTORICAL = "HISTORICAL"
@@ -54,12 +87,14 @@ class DataRouter:
     - Market CLOSED: Historical cache only
     """
     
+    # Flipped to True on the instance by _refresh_market_status()
+    _initialized: bool = False
+    
     def __init__(self):
         """Initialize the data router."""
         self._market_status: Optional[Dict] = None
         self._data_mode: Optional[str] = None
         self._data_source: Optional[str] = None
-        self._initialized = False
         
         # Current selection state
         self._selected_symbol: str = "SPY"
@@ -67,6 +102,20 @@ class DataRouter:
         
         # Live adapter (only initialized if market is open)
         self._live_adapter = None
+        
+        # Historical cache index (reset whenever market status is refreshed)
+        self._symbols_cache: Optional[Tuple[str, ...]] = None
+        self._symbols_set: frozenset = frozenset()
+        self._ranges_cache: Optional[Dict[str, Dict]] = None
+        
+        # Live metadata template (copied and filled per request)
+        self._metadata_template: Dict[str, Any] = {
+            "symbol": None,
+            "data_source": DATA_SOURCE_LIVE,
+            "feed_mode": DATA_MODE_LIVE,
+            "candle_count": 0,
+            "timestamp": None
+        }
     
     def initialize(self) -> Dict[str, Any]:
         """
@@ -83,13 +132,12 @@ class DataRouter:
         """Fetch authoritative market status and update internal state."""
         # Get authoritative market status
         self._market_status = get_market_status()
-        self._last_status_check = datetime.now()
         is_open = self._market_status.get("is_open", False)
         
         # Log transition if state changes
         new_mode = DATA_MODE_LIVE if is_open else DATA_MODE_HISTORICAL
         if self._data_mode and self._data_mode != new_mode:
-            print(f"🔄 [DataRouter] Market Status Transition: {self._data_mode} -> {new_mode}")
+            log.info("🔄 [DataRouter] Market Status Transition: %s -> %s", self._data_mode, new_mode)
         
         if is_open:
             self._data_mode = DATA_MODE_LIVE
@@ -99,17 +147,33 @@ class DataRouter:
             self._data_mode = DATA_MODE_HISTORICAL
             self._data_source = DATA_SOURCE_HISTORICAL
             self._live_adapter = None
+            self._symbols_cache = None
+            self._ranges_cache = None
         
         self._initialized = True
     
+    def _historical_symbols(self) -> Tuple[str, ...]:
+        """Cached list of symbols available in the historical cache."""
+        if self._symbols_cache is None:
+            self._symbols_cache = get_available_symbols()
+            self._symbols_set = frozenset(self._symbols_cache)
+        return self._symbols_cache
+    
+    def _historical_time_ranges(self) -> Dict[str, Dict]:
+        """Cached historical time range options."""
+        if self._ranges_cache is None:
+            self._ranges_cache = get_time_ranges()
+        return self._ranges_cache
+    
     def _initialize_live_adapter(self):
         """Initialize the live Alpaca adapter if credentials are available."""
         try:
-            from broker.alpaca_adapter import AlpacaAdapter
-            self._live_adapter = AlpacaAdapter()
-            print("✓ [DataRouter] Live adapter initialized (Alpaca + Polygon)")
+            if alpaca_adapter is None:
+                raise ImportError("broker.alpaca_adapter is not available")
+            self._live_adapter = alpaca_adapter.AlpacaAdapter()
+            log.info("✓ [DataRouter] Live adapter initialized (Alpaca + Polygon)")
         except Exception as e:
-            print(f"⚠️ [DataRouter] Live adapter initialization failed: {e}")
+            log.warning("⚠️ [DataRouter] Live adapter initialization failed: %s", e)
             # If live adapter fails when market is open, this is an ERROR condition
             # Do NOT fall back to historical data silently
             self._live_adapter = None
@@ -135,7 +199,7 @@ class DataRouter:
             "data_mode": self._data_mode,
             "data_source": self._data_source,
             "selected_symbol": self._selected_symbol,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
         
         if is_open:
@@ -149,8 +213,8 @@ class DataRouter:
             }
         else:
             # Historical mode: symbols from cache
-            config["available_symbols"] = get_available_symbols()
-            config["available_time_ranges"] = get_time_ranges()
+            config["available_symbols"] = self._historical_symbols()
+            config["available_time_ranges"] = self._historical_time_ranges()
             config["selected_time_range"] = self._selected_time_range
             config["controls_enabled"] = {
                 "symbol_selector": True,
@@ -171,8 +235,9 @@ class DataRouter:
         
         try:
             positions = self._live_adapter.get_positions()
-            return [p.get("symbol") for p in positions if p.get("symbol")]
-        except Exception:
+            return [s for p in positions if (s := p.get("symbol"))]
+        except Exception as e:
+            log.warning("⚠️ [DataRouter] Live symbols unavailable: %s", e)
             return []
     
     def set_symbol(self, symbol: str) -> Dict[str, Any]:
@@ -200,11 +265,11 @@ class DataRouter:
                 "Symbols reflect current portfolio holdings."
             )
         
-        available = get_available_symbols()
-        if symbol not in available:
+        available = self._historical_symbols()
+        if symbol not in self._symbols_set:
             raise ValueError(
                 f"Symbol '{symbol}' not found in historical cache. "
-                f"Available: {available}"
+                f"Available: {list(available)}"
             )
         
         self._selected_symbol = symbol
@@ -234,11 +299,11 @@ class DataRouter:
                 "Time range selection disabled during live market hours."
             )
         
-        available_ranges = get_time_ranges()
+        available_ranges = self._historical_time_ranges()
         if time_range not in available_ranges:
             raise ValueError(
                 f"Invalid time range '{time_range}'. "
-                f"Available: {list(available_ranges.keys())}"
+                f"Available: {list(available_ranges)}"
             )
         
         self._selected_time_range = time_range
@@ -287,6 +352,11 @@ class DataRouter:
             
             headlines = self._live_adapter.get_headlines()
             
+            metadata = self._metadata_template.copy()
+            metadata["symbol"] = self._selected_symbol
+            metadata["candle_count"] = len(candles) if candles else 0
+            metadata["timestamp"] = _now_iso()
+            
             return {
                 "status": "success",
                 "data_mode": DATA_MODE_LIVE,
@@ -294,13 +364,7 @@ class DataRouter:
                 "symbol": self._selected_symbol,
                 "candles": candles or [],
                 "headlines": headlines or [],
-                "metadata": {
-                    "symbol": self._selected_symbol,
-                    "data_source": DATA_SOURCE_LIVE,
-                    "feed_mode": DATA_MODE_LIVE,
-                    "candle_count": len(candles) if candles else 0,
-                    "timestamp": datetime.now().isoformat()
-                }
+                "metadata": metadata
             }
         except Exception as e:
             return {
@@ -328,6 +392,81 @@ class DataRouter:
         
         return result
     
+    def get_market_data_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get market data for several symbols from the appropriate source.
+        
+        Live mode fetches all symbols' bars in one Alpaca request and the
+        headlines once; historical mode reads each symbol from the cache
+        with the selected time range.
+        
+        Returns:
+            Dict of symbol -> get_market_data()-shaped result
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        if self._market_status.get("is_open", False):
+            return self._get_live_market_data_batch(symbols)
+        return self._get_historical_market_data_batch(symbols)
+    
+    def _get_live_market_data_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch live market data for several symbols from Alpaca + Polygon."""
+        if self._live_adapter is None:
+            error = "Live adapter not available"
+        else:
+            try:
+                candles_by_symbol = self._live_adapter.get_recent_candles_batch(
+                    symbols,
+                    limit=50,
+                    timeframe="1Min"
+                )
+                headlines = self._live_adapter.get_headlines() or []
+            except Exception as e:
+                error = str(e)
+            else:
+                timestamp = _now_iso()
+                results = {}
+                for symbol in symbols:
+                    candles = candles_by_symbol.get(symbol) or []
+                    metadata = self._metadata_template.copy()
+                    metadata["symbol"] = symbol
+                    metadata["candle_count"] = len(candles)
+                    metadata["timestamp"] = timestamp
+                    results[symbol] = {
+                        "status": "success",
+                        "data_mode": DATA_MODE_LIVE,
+                        "data_source": DATA_SOURCE_LIVE,
+                        "symbol": symbol,
+                        "candles": candles,
+                        "headlines": headlines,
+                        "metadata": metadata
+                    }
+                return results
+        
+        return {
+            symbol: {
+                "status": "error",
+                "error": error,
+                "data_mode": DATA_MODE_LIVE,
+                "data_source": self._data_source,
+                "candles": [],
+                "metadata": None
+            }
+            for symbol in symbols
+        }
+    
+    def _get_historical_market_data_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch historical market data for several symbols from cache."""
+        results = load_historical_data_batch(symbols, self._selected_time_range)
+        for symbol, result in results.items():
+            result["data_mode"] = DATA_MODE_HISTORICAL
+            result["data_source"] = DATA_SOURCE_HISTORICAL
+            result["symbol"] = symbol
+            result["time_range"] = self._selected_time_range
+            result["headlines"] = []  # No news archive in historical mode
+        return results
+    
     def get_portfolio_data(self) -> Dict[str, Any]:
         """
         Get portfolio data from the appropriate source.
@@ -423,12 +562,11 @@ class DataRouter:
         if is_open and self._live_adapter:
             try:
                 return self._live_adapter.get_sector_heatmap()
-            except Exception:
-                pass
+            except Exception as e:
+                log.warning("⚠️ [DataRouter] Live sector heatmap failed: %s", e)
         
         # Historical mode or fallback
-        service = get_historical_service()
-        return service.generate_sector_heatmap(self._selected_symbol)
+        return dict(_historical_sector_heatmap(self._selected_symbol))
     
     def get_candidates(self) -> List[Dict[str, Any]]:
         """Get trading candidates for current context."""
@@ -442,34 +580,37 @@ class DataRouter:
                 candidates = self._live_adapter.get_candidates()
                 if candidates:
                     return candidates
-            except Exception:
-                pass
+            except Exception as e:
+                log.warning("⚠️ [DataRouter] Live candidates failed: %s", e)
         
-        # Historical mode: generate minimal candidates for decision engine
-        # These are symbolic - the engine needs SOMETHING to process
-        return [
-            {"symbol": "CANDIDATE_A", "sector": "TECH", "projected_efficiency": 70.0},
-            {"symbol": "CANDIDATE_B", "sector": "HEALTHCARE", "projected_efficiency": 65.0}
-        ]
+        # Historical mode: minimal symbolic candidates for decision engine
+        return list(_HISTORICAL_CANDIDATES)
 
 
 # Singleton instance
 _router_instance: Optional[DataRouter] = None
+_router_lock = threading.Lock()
 
 
 def get_data_router() -> DataRouter:
     """Get or create the singleton DataRouter instance."""
     global _router_instance
     if _router_instance is None:
-        _router_instance = DataRouter()
-        _router_instance.initialize()
+        with _router_lock:
+            # Double-checked: only one thread constructs and initializes
+            if _router_instance is None:
+                router = DataRouter()
+                router.initialize()
+                _router_instance = router
     return _router_instance
 
 
 def reset_router():
     """Reset the router (for testing or re-initialization)."""
     global _router_instance
-    _router_instance = None
+    with _router_lock:
+        _router_instance = None
+    _historical_sector_heatmap.cache_clear()
 
 
 # Convenience functions
@@ -493,6 +634,11 @@ def get_market_data() -> Dict[str, Any]:
     return get_data_router().get_market_data()
 
 
+def get_market_data_batch(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Get market data for several symbols from appropriate source."""
+    return get_data_router().get_market_data_batch(symbols)
+
+
 def get_portfolio_data() -> Dict[str, Any]:
     """Get portfolio data from appropriate source."""
     return get_data_router().get_portfolio_data()
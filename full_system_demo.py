@@ -12,15 +12,19 @@ Data Sources (Priority Order):
 No real funds. No live trading. Pure logic validation.
 """
 
+import copy
+import io
 import os
+import sys
 import json
+from collections import Counter
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
 import volatility_metrics
 import news_scorer
 import sector_confidence
-import decision_engine
-import execution_planner
-import risk_guardrails
-import execution_summary
 import market_mode
 from backend import market_status
 from backend.scenarios import get_scenario
@@ -38,11 +42,13 @@ HISTORICAL_VALIDATION = os.environ.get("HISTORICAL_VALIDATION")
 if HISTORICAL_VALIDATION and HISTORICAL_VALIDATION.lower() == "true":
     from validation.runner import run_validation
     run_validation()
-    import sys
     sys.exit(0)
 
 # 1. Detect Environment State
-EXECUTION_CONTEXT = market_mode.determine_execution_context()
+# Computed ONCE per process from a single status snapshot: market_mode's
+# status cache expires, but the demo must not switch modes mid-run.
+MARKET_STATUS = market_mode.get_market_status()
+EXECUTION_CONTEXT = market_mode.determine_execution_context(MARKET_STATUS)
 
 # 2. Extract specific mode flags for internal logic
 IS_LIVE = (EXECUTION_CONTEXT["data_feed_mode"] == "LIVE")
@@ -56,6 +62,19 @@ SUPPORTED_TIME_RANGES = ["1M", "4M", "6M", "1Y"]
 ACTIVE_SYMBOL = os.environ.get("VAL_SYMBOL", "SPY")
 ACTIVE_RANGE = os.environ.get("VAL_RANGE", "6M")
 
+# Historical time range -> start date (cached data ends 2023-06-01)
+HISTORICAL_END_DATE = "2023-06-01"
+RANGE_START_DATES = {
+    "1M": "2023-05-01",
+    "4M": "2023-02-01",
+    "6M": "2023-01-01",
+    "1Y": "2022-06-01",  # Might fetch if missing
+}
+DEFAULT_RANGE_START = "2023-01-01"  # 6M approx
+
+# Position PnL marker, indexed by (pnl > 0)
+PNL_INDICATORS = ("🔴", "🟢")
+
 
 # =============================================================================
 # CAPABILITY DISCLOSURE (MANDATORY FOR JUDGES)
@@ -64,46 +83,61 @@ ACTIVE_RANGE = os.environ.get("VAL_RANGE", "6M")
 def print_run_configuration():
     """Print clear, honest capability disclosure at startup."""
     
-    print()
-    print("╔" + "═" * 58 + "╗")
-    print("║" + "RUN CONFIGURATION".center(58) + "║")
-    print("╠" + "═" * 58 + "╣")
-    print(f"║  System Mode       : {EXECUTION_CONTEXT['system_mode']:<35}║")
-    print(f"║  Market Status     : {EXECUTION_CONTEXT['market_status']:<35}║")
-    print(f"║  Data Feed Mode    : {EXECUTION_CONTEXT['data_feed_mode']:<35}║")
-    print(f"║  Data Capability   : {EXECUTION_CONTEXT['data_capability']:<35}║")
+    lines = [
+        "",
+        "╔" + "═" * 58 + "╗",
+        "║" + "RUN CONFIGURATION".center(58) + "║",
+        "╠" + "═" * 58 + "╣",
+        "║  System Mode       : {system_mode:<35}║".format_map(EXECUTION_CONTEXT),
+        "║  Market Status     : {market_status:<35}║".format_map(EXECUTION_CONTEXT),
+        "║  Data Feed Mode    : {data_feed_mode:<35}║".format_map(EXECUTION_CONTEXT),
+        "║  Data Capability   : {data_capability:<35}║".format_map(EXECUTION_CONTEXT),
+    ]
     
     if DEMO_MODE:
-        print(f"║  Active Profile    : {DEMO_PROFILE:<35}║")
-        print(f"║  Trend Overlay     : {DEMO_TREND if DEMO_TREND != 'NEUTRAL' else 'NONE':<35}║")
+        lines.append(f"║  Active Profile    : {DEMO_PROFILE:<35}║")
+        lines.append(f"║  Trend Overlay     : {DEMO_TREND if DEMO_TREND != 'NEUTRAL' else 'NONE':<35}║")
         
-    print(f"║  Execution         : {'DISABLED (Advisory Only)':<35}║")
-    print("╚" + "═" * 58 + "╝")
+    lines.append(f"║  Execution         : {'DISABLED (Advisory Only)':<35}║")
+    lines.append("╚" + "═" * 58 + "╝")
     
     if EXECUTION_CONTEXT['market_status'] != "OPEN" and not DEMO_MODE:
-        print(f"\n⚠️  MARKET IS CLOSED ({EXECUTION_CONTEXT['reason']}).")
-        print("   System correctly using synthetic data to validate logic invariant.")
-    print()
+        lines.append(f"\n⚠️  MARKET IS CLOSED ({EXECUTION_CONTEXT['reason']}).")
+        lines.append("   System correctly using synthetic data to validate logic invariant.")
+    lines.append("")
+    
+    # One write for the whole banner instead of a print() per line
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 # =============================================================================
 # INITIALIZE DATA SOURCE
 # =============================================================================
 
-_adapter = None
-_hist_manager = None
+# Data sources are constructed on first use, not at import time
 
-if IS_LIVE:
+@lru_cache(maxsize=1)
+def _get_adapter():
+    """Shared Alpaca adapter in LIVE mode (None otherwise or on failure)."""
+    if not IS_LIVE:
+        return None
     try:
         from broker.alpaca_adapter import AlpacaAdapter
-        _adapter = AlpacaAdapter()
+        return AlpacaAdapter()
     except Exception as e:
         print(f"❌ Alpaca Connection Failed in LIVE mode: {e}")
         # In strict mode, we don't fallback to dummy if it's supposed to be live.
         # But for stability in this dev environment, we'll log it.
-elif IS_HISTORICAL:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _get_hist_manager():
+    """Shared historical data manager in HISTORICAL mode (None otherwise)."""
+    if not IS_HISTORICAL:
+        return None
     from validation.data_manager import HistoricalDataManager
-    _hist_manager = HistoricalDataManager()
+    return HistoricalDataManager()
 
 
 # =============================================================================
@@ -112,8 +146,9 @@ elif IS_HISTORICAL:
 
 def get_portfolio_context():
     """Returns portfolio state. Live from Alpaca, Fixed for Historical Validation."""
-    if IS_LIVE and _adapter:
-        return _adapter.get_portfolio()
+    adapter = _get_adapter()
+    if adapter:
+        return adapter.get_portfolio()
     
     # Historical / Closed Market baseline
     return {
@@ -125,15 +160,17 @@ def get_portfolio_context():
 
 def get_positions():
     """Returns positions. Live from Alpaca, Empty for Historical Validation."""
-    if IS_LIVE and _adapter:
-        return _adapter.get_positions()
+    adapter = _get_adapter()
+    if adapter:
+        return adapter.get_positions()
     return []
 
 
 def get_candidates(symbol=None):
     """Returns trade candidates. Live from Alpaca, Fixed for Historical."""
-    if IS_LIVE and _adapter:
-        return _adapter.get_candidates()
+    adapter = _get_adapter()
+    if adapter:
+        return adapter.get_candidates()
     
     # Historical validation typically tests specific candidates
     target = symbol or ACTIVE_SYMBOL
@@ -144,11 +181,34 @@ def get_candidates(symbol=None):
 
 def get_sector_heatmap():
     """Returns sector heat scores."""
-    if IS_LIVE and _adapter:
-        return _adapter.get_sector_heatmap()
+    adapter = _get_adapter()
+    if adapter:
+        return adapter.get_sector_heatmap()
     return {"TECH": 60, "SPY": 50}
 
 
+def get_core_data(symbol=None):
+    """
+    Returns (portfolio, positions, sector_heatmap, candidates).
+    Live mode fetches all four from one adapter snapshot.
+    """
+    adapter = _get_adapter()
+    if adapter:
+        snapshot = adapter.get_snapshot()
+        return (
+            snapshot["portfolio"],
+            snapshot["positions"],
+            snapshot["heatmap"],
+            snapshot["candidates"]
+        )
+    return (
+        get_portfolio_context(),
+        get_positions(),
+        get_sector_heatmap(),
+        get_candidates(symbol)
+    )
+
+
 def get_market_data(symbol=None, time_range=None):
     """
     Returns candles and news headlines.
@@ -157,39 +217,104 @@ def get_market_data(symbol=None, time_range=None):
     target_sym = symbol or ACTIVE_SYMBOL
     target_range = time_range or ACTIVE_RANGE
     
-    if IS_LIVE and _adapter:
-        candles = _adapter.get_recent_candles(target_sym, 20)
-        headlines = _adapter.get_headlines()
+    adapter = _get_adapter()
+    if adapter:
+        candles = adapter.get_recent_candles(target_sym, 20)
+        headlines = adapter.get_headlines()
         return candles, headlines
     
-    if IS_HISTORICAL and _hist_manager:
+    hist_manager = _get_hist_manager()
+    if hist_manager:
         # Map time range to dates
-        end_dt = "2023-06-01" # Fixed end for the cached data
-        if target_range == "1M": start_dt = "2023-05-01"
-        elif target_range == "4M": start_dt = "2023-02-01"
-        elif target_range == "1Y": start_dt = "2022-06-01" # Might fetch if missing
-        else: start_dt = "2023-01-01" # Default 6M approx
-            
-        candles = _hist_manager.fetch_history(target_sym, start_dt, end_dt)
+        start_dt = RANGE_START_DATES.get(target_range, DEFAULT_RANGE_START)
+        candles = hist_manager.fetch_history(target_sym, start_dt, HISTORICAL_END_DATE)
         # News is empty for historical validation as we don't have a news archive
         return candles, []
     
     return [], []
 
 
+def get_market_data_batch(symbols, time_range=None):
+    """
+    Returns {symbol: (candles, headlines)} for several symbols.
+    Live mode fetches every symbol's candles in one adapter request.
+    """
+    target_range = time_range or ACTIVE_RANGE
+    
+    adapter = _get_adapter()
+    if adapter:
+        candles_by_symbol = adapter.get_recent_candles_batch(list(symbols), 20)
+        headlines = adapter.get_headlines()
+        return {sym: (candles_by_symbol.get(sym, []), headlines) for sym in symbols}
+    
+    return {sym: get_market_data(sym, target_range) for sym in symbols}
+
+
+@dataclass(frozen=True, slots=True)
+class DemoContext:
+    """Inputs for one demo invocation, fetched once and shared by the runners."""
+    portfolio: dict
+    positions: list
+    heatmap: dict
+    candidates: list
+    candles: list
+    headlines: list
+
+
+def build_demo_context(symbol=None, time_range=None):
+    """Fetch core data and market data once for a demo invocation."""
+    portfolio, positions, heatmap, candidates = get_core_data(symbol)
+    candles, headlines = get_market_data(symbol, time_range)
+    return DemoContext(portfolio, positions, heatmap, candidates, candles, headlines)
+
+
 # =============================================================================
 # API-COMPATIBLE OUTPUT FUNCTION (NO PRINTING)
 # =============================================================================
 
-def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
+def _candle_file_mtime(symbol, time_range):
+    """Modification time of the historical candle file backing a run (None if absent)."""
+    hist_manager = _get_hist_manager()
+    if not hist_manager:
+        return None
+    start_dt = RANGE_START_DATES.get(time_range, DEFAULT_RANGE_START)
+    try:
+        return os.path.getmtime(hist_manager._get_cache_path(symbol, start_dt, HISTORICAL_END_DATE))
+    except OSError:
+        return None
+
+
+def run_demo_scenario(scenario_id=None, symbol=None, time_range=None, ctx=None):
     """
     Returns full system output as JSON-safe dict.
     Strictly routed by market status (IS_LIVE / IS_HISTORICAL).
+    
+    Outside live trading the result only depends on the arguments and the
+    candle file on disk, so it is memoized on (scenario, symbol, range, mtime).
+    A caller-supplied DemoContext is used as-is and bypasses the memo.
     """
+    if ctx is not None or IS_LIVE or _get_adapter():
+        return _run_demo_scenario(scenario_id, symbol, time_range, ctx)
+    
+    mtime = _candle_file_mtime(symbol or ACTIVE_SYMBOL, time_range or ACTIVE_RANGE)
+    # Deep copy so callers can't mutate the cached result
+    return copy.deepcopy(_run_demo_scenario_cached(scenario_id, symbol, time_range, mtime))
+
+
+@lru_cache(maxsize=128)
+def _run_demo_scenario_cached(scenario_id, symbol, time_range, mtime):
+    return _run_demo_scenario(scenario_id, symbol, time_range)
+
+
+def _run_demo_scenario(scenario_id=None, symbol=None, time_range=None, ctx=None):
+    # Decision/planning layers are only needed once a scenario runs
+    import decision_engine
+    import execution_planner
+    import execution_summary
+    
     # 1. Market Status & Mode
-    # Use global execution context as source of truth
-    status = market_mode.get_market_status()
-    is_open = (status["status"] == "OPEN")
+    # Use global execution context (and its status snapshot) as source of truth
+    status = MARKET_STATUS
     
     data_mode = EXECUTION_CONTEXT["data_feed_mode"]
     portfolio_source = EXECUTION_CONTEXT["data_capability"]
@@ -198,14 +323,11 @@ def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
     target_sym = symbol or ACTIVE_SYMBOL
     target_range = time_range or ACTIVE_RANGE
 
-    # 2. Fetch Core Data (Depends on target_sym)
-    portfolio = get_portfolio_context()
-    positions = get_positions()
-    sector_heatmap = get_sector_heatmap()
-    candidates = get_candidates(target_sym)
-    
-    # 3. Fetch Market Data (Candles/News)
-    candles, headlines = get_market_data(target_sym, target_range)
+    # 2. Fetch Core Data (Depends on target_sym) and Market Data (Candles/News)
+    if ctx is None:
+        ctx = build_demo_context(target_sym, target_range)
+    portfolio, positions, sector_heatmap, candidates = ctx.portfolio, ctx.positions, ctx.heatmap, ctx.candidates
+    candles, headlines = ctx.candles, ctx.headlines
 
     # =========================================================
     # SCENARIO INJECTION (If scenario_id is provided)
@@ -272,25 +394,29 @@ def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
     safe_decisions = decision_report.get("decisions", [])
     blocked_decisions = decision_report.get("blocked_by_safety", [])
     concentration_risk = decision_report.get("concentration_risk", {})
+    primary_intent = posture.get("market_posture", "NEUTRAL")
 
     # Calculate Avg Vitals from Decisions for UI
-    pos_scores = [d["score"] for d in safe_decisions if d["type"] == "POSITION"]
-    if pos_scores:
-        avg_vitals = int(sum(pos_scores) / len(pos_scores))
-    else:
-        avg_vitals = 0
+    score_total = 0
+    score_count = 0
+    for d in safe_decisions:
+        if d["type"] == "POSITION":
+            score_total += d["score"]
+            score_count += 1
+    avg_vitals = int(score_total / score_count) if score_count else 0
 
     # Generate Execution Plan
     if safe_decisions:
-        simulated_decision_input = {"decision": posture.get("market_posture", "NEUTRAL")}
+        simulated_decision_input = {"decision": primary_intent}
         plan_output = execution_planner.generate_execution_plan(simulated_decision_input, positions)
     else:
         plan_output = {"proposed_actions": []}
+    proposed_actions = plan_output.get("proposed_actions", [])
     
     # Generate Summary
     summary_context = {
-        "primary_intent": posture.get("market_posture", "NEUTRAL"),
-        "proposed_actions": plan_output.get("proposed_actions", []),
+        "primary_intent": primary_intent,
+        "proposed_actions": proposed_actions,
         "blocked_actions": blocked_decisions,
         "mode": posture.get("risk_level", "MEDIUM")
     }
@@ -300,7 +426,7 @@ def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
     analysis_result = {
         # Phase 2 Signals
         "signals": {
-            "volatility_state": vol_state or decision_report.get("market_posture", {}).get("reasons", ["UNKNOWN"])[0], # Fallback if not overridden
+            "volatility_state": vol_state or posture.get("reasons", ["UNKNOWN"])[0], # Fallback if not overridden
             "volatility_explanation": "Processed from candles",
             "news_score": news_score_val or 50,
             "news_explanation": f"Processed {len(headlines)} headlines",
@@ -313,7 +439,7 @@ def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
         "blocked_by_safety": blocked_decisions,
         "concentration_risk": concentration_risk,
         # Phase 4 Planning
-        "execution_plan": plan_output.get("proposed_actions", []),
+        "execution_plan": proposed_actions,
         "execution_summary": summary,
         # Metadata
         "input_stats": {
@@ -333,7 +459,7 @@ def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
     
     # Wrap in API Contract
     return {
-        "market_status": status,
+        "market_status": dict(status),
         "data_mode": data_mode,
         "symbols_used": [symbol] if symbol else [],
         "portfolio_source": portfolio_source,
@@ -345,7 +471,47 @@ def run_demo_scenario(scenario_id=None, symbol=None, time_range=None):
 # MAIN DEMO RUNNER
 # =============================================================================
 
-def run_full_system_demo():
+class _PhaseOutput(io.StringIO):
+    """Demo stdout buffer, written to the real stream once per phase."""
+    
+    def __init__(self, target):
+        super().__init__()
+        self._target = target
+    
+    def end_phase(self):
+        """Write everything printed since the last call in one write."""
+        text = self.getvalue()
+        if text:
+            self._target.write(text)
+            self._target.flush()
+            self.seek(0)
+            self.truncate()
+
+
+def run_full_system_demo(ctx=None):
+    """
+    Run the printed end-to-end demo.
+    
+    Each phase's output is written to stdout in one call when the phase
+    ends (also when the demo raises), so progress still shows between
+    phases without a write per print().
+    Data is fetched via build_demo_context() unless a DemoContext is passed.
+    """
+    out = _PhaseOutput(sys.stdout)
+    try:
+        with redirect_stdout(out):
+            _run_full_system_demo(ctx, out.end_phase)
+    finally:
+        out.end_phase()
+
+
+def _run_full_system_demo(ctx, end_phase):
+    import decision_engine
+    import execution_planner
+    
+    if ctx is None:
+        ctx = build_demo_context()
+    
     # Print capability disclosure FIRST
     print_run_configuration()
     
@@ -362,6 +528,8 @@ def run_full_system_demo():
             print(f"🌊 Trend: {DEMO_TREND}")
             print(f"   → {get_overlay_description(DEMO_TREND)}")
     
+    end_phase()
+    
     # ---------------------------------------------------------
     # PHASE 2 - SIGNAL GENERATION
     # ---------------------------------------------------------
@@ -369,7 +537,7 @@ def run_full_system_demo():
     print("=== PHASE 2: SIGNAL GENERATION ===")
     print("=" * 60)
     
-    candles, headlines = get_market_data()
+    candles, headlines = ctx.candles, ctx.headlines
     
     # A. Volatility
     atr_res = volatility_metrics.compute_atr(candles)
@@ -412,6 +580,8 @@ def run_full_system_demo():
         "news": headlines
     }
 
+    end_phase()
+    
     # ---------------------------------------------------------
     # PHASE 3 - DECISION MAKING
     # ---------------------------------------------------------
@@ -419,33 +589,36 @@ def run_full_system_demo():
     print("=== PHASE 3: DECISION MAKING ===")
     print("=" * 60)
     
-    portfolio = get_portfolio_context()
-    positions = get_positions()
-    heatmap = get_sector_heatmap()
-    candidates = get_candidates()
+    portfolio, positions, heatmap, candidates = ctx.portfolio, ctx.positions, ctx.heatmap, ctx.candidates
     
     print(f"\n📈 [Portfolio Overview]")
     print(f"   Total Capital: ${portfolio['total_capital']:,.0f}")
     print(f"   Cash Available: ${portfolio['cash']:,.0f} ({portfolio['cash']/portfolio['total_capital']*100:.1f}%)")
     print(f"\n📊 [Positions: {len(positions)}]")
     
-    # Calculate sector exposure
-    sector_exposure = {}
-    for p in positions:
-        sector = p.get("sector", "OTHER")
-        sector_exposure[sector] = sector_exposure.get(sector, 0) + p["capital_allocated"]
-    
-    for p in positions:
-        pnl = ((p["current_price"] - p["entry_price"]) / p["entry_price"]) * 100
-        pnl_indicator = "🟢" if pnl > 0 else "🔴"
+    # PnL for all positions in one vector op
+    n_positions = len(positions)
+    entry = np.fromiter((p["entry_price"] for p in positions), dtype=np.float64, count=n_positions)
+    current = np.fromiter((p["current_price"] for p in positions), dtype=np.float64, count=n_positions)
+    pnls = ((current - entry) / entry * 100.0).tolist()
+    
+    # Print positions and accumulate sector exposure in the same pass
+    sector_exposure = Counter()
+    for p, pnl in zip(positions, pnls):
+        sector_exposure[p.get("sector", "OTHER")] += p["capital_allocated"]
+        pnl_indicator = PNL_INDICATORS[pnl > 0]
         print(f"   {pnl_indicator} {p['symbol']:<6} | {p['sector']:<10} | ${p['capital_allocated']:>10,.0f} | {pnl:>+6.1f}%")
     
     print(f"\n🎯 [Sector Concentration]")
-    for sector, alloc in sorted(sector_exposure.items(), key=lambda x: -x[1]):
-        pct = (alloc / portfolio['total_capital']) * 100
+    pct_per_dollar = 100.0 / portfolio['total_capital']
+    for sector, alloc in sector_exposure.most_common():
+        pct = alloc * pct_per_dollar
         warning = "⚠️ " if pct > 60 else "   "
         print(f"   {warning}{sector}: {pct:.1f}%")
     
+    # Show the portfolio overview while the engine runs
+    end_phase()
+    
     # Run the Engine
     decision_report = decision_engine.run_decision_engine(
         portfolio_state=portfolio,
@@ -465,6 +638,8 @@ def run_full_system_demo():
     print(f"\n📝 [Portfolio Manager Summary]")
     print(f"   \"{pm_summary}\"")
 
+    end_phase()
+    
     # ---------------------------------------------------------
     # DECISIONS & EXPLANATIONS
     # ---------------------------------------------------------
@@ -522,6 +697,8 @@ def run_full_system_demo():
         for d in safe_decisions:
             print(f"   • {d['target']:<8} → {d['action']:<15} (Score: {d['score']})")
 
+    end_phase()
+    
     # ---------------------------------------------------------
     # SAFETY & GUARDRAILS
     # ---------------------------------------------------------
@@ -538,6 +715,8 @@ def run_full_system_demo():
             safety_reason = b.get('safety_reason', b.get('blocking_guard', 'Safety violation'))
             print(f"      🛑 BLOCKED: {safety_reason}")
 
+    end_phase()
+    
     # ---------------------------------------------------------
     # EXECUTION PLANNING
     # ---------------------------------------------------------
@@ -556,6 +735,8 @@ def run_full_system_demo():
     else:
         print("\n   No actions to plan.")
 
+    end_phase()
+    
     # ---------------------------------------------------------
     # FINAL SUMMARY
     # ---------------------------------------------------------
@@ -576,4 +757,4 @@ def run_full_system_demo():
 
 
 if __name__ == "__main__":
-    run_full_system_demo()
+    run_full_system_demo(build_demo_context())
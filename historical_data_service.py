@@ -13,13 +13,36 @@ NO demo/synthetic data.
 """
 
 import os
-import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+try:
+    import orjson as _json  # C parser for the candle files
+except ImportError:
+    import json as _json  # stdlib fallback (same loads() API)
 
 # Cache directory relative to this file
 CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historical_cache")
 
+# Parsed candle lists kept in memory (oldest entry evicted first)
+CANDLE_CACHE_MAX_ENTRIES = 32
+
+# Cache file names: SYMBOL_STARTDATE_ENDDATE.json
+# (symbols may be lowercase or contain '.'/'-', e.g. BRK.B, BRK-B)
+_CACHE_NAME_RE = re.compile(
+    r"^(?P<sym>[A-Za-z0-9.\-]+)_(?P<start>\d{4}-\d{2}-\d{2})_(?P<end>\d{4}-\d{2}-\d{2})\.json$"
+)
+
+# posix_fadvise is POSIX-only (absent on Windows/macOS builds)
+_FADVISE = hasattr(os, "posix_fadvise")
+
+# Upper bound on threads used to parse cache files at startup
+SCAN_MAX_WORKERS = 8
+
 # Available time ranges (in months) and their labels
 TIME_RANGES = {
     "1M": {"months": 1, "label": "1 Month"},
@@ -28,6 +51,25 @@ TIME_RANGES = {
     "1Y": {"months": 12, "label": "1 Year"}
 }
 
+# Flat per-range lookups derived from TIME_RANGES (a month is 30 days)
+TIME_RANGE_DAYS = {key: spec["months"] * 30 for key, spec in TIME_RANGES.items()}
+TIME_RANGE_LABELS = {key: spec["label"] for key, spec in TIME_RANGES.items()}
+
+# Sector assigned to a historical position, by symbol
+SYMBOL_SECTORS = {
+    "SPY": "INDEX",
+    "QQQ": "TECH",
+    "IWM": "SMALL_CAP"
+}
+
+# Neutral baseline heatmaps with emphasis on the selected symbol's sector
+SECTOR_HEATMAPS = {
+    "SPY": {"INDEX": 60, "TECH": 55, "HEALTHCARE": 50, "ENERGY": 45},
+    "QQQ": {"TECH": 70, "INDEX": 50, "HEALTHCARE": 45, "ENERGY": 40},
+    "IWM": {"SMALL_CAP": 55, "INDEX": 50, "TECH": 50, "ENERGY": 50}
+}
+DEFAULT_SECTOR_HEATMAP = {"EQUITY": 50, "TECH": 50, "INDEX": 50}
+
 
 class HistoricalDataService:
     """
@@ -43,65 +85,193 @@ class HistoricalDataService:
         """Initialize the service and scan available data."""
         self._cache_dir = CACHE_DIR
         self._available_symbols: List[str] = []
+        # Read-only snapshot of _available_symbols (rebuilt after a rescan)
+        self._available_symbols_tuple: Optional[Tuple[str, ...]] = None
         self._cache_metadata: Dict[str, Dict] = {}
+        
+        # Parsed candles per cache file, valid while the file mtime matches
+        self._candle_cache: Dict[str, List[Dict]] = {}
+        self._cache_mtime: Dict[str, float] = {}
+        # Start index of every TIME_RANGES window per cached file
+        # (None if the file's timestamps can't be indexed)
+        self._range_starts: Dict[str, Optional[Dict[str, int]]] = {}
+        # Guards the three dicts above; files are parsed outside it
+        self._lock = threading.Lock()
+        
         self._scan_cache()
     
     def _scan_cache(self):
-        """Scan the cache directory for available data files."""
+        """
+        Scan the cache directory for available data files.
+        
+        Only the directory listing is read here. Files are parsed on first
+        use, and candle_count stays -1 (unknown) until then.
+        """
         if not os.path.exists(self._cache_dir):
             print(f"⚠️ [HistoricalDataService] Cache directory not found: {self._cache_dir}")
             return
         
+        entries = []
         for filename in os.listdir(self._cache_dir):
-            if not filename.endswith('.json'):
-                continue
+            m = _CACHE_NAME_RE.match(filename)
+            if m:
+                entries.append((*m.group('sym', 'start', 'end'), filename))
+        
+        for symbol, start_date, end_date, filename in entries:
+            if symbol not in self._available_symbols:
+                self._available_symbols.append(symbol)
             
-            # Parse filename: SYMBOL_STARTDATE_ENDDATE.json
-            parts = filename.replace('.json', '').split('_')
-            if len(parts) >= 3:
-                symbol = parts[0]
-                start_date = parts[1]
-                end_date = parts[2]
-                
-                filepath = os.path.join(self._cache_dir, filename)
-                
-                # Load data to get candle count
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                    candle_count = len(data)
-                except Exception as e:
-                    print(f"⚠️ [HistoricalDataService] Error reading {filename}: {e}")
-                    candle_count = 0
-                    data = []
-                
-                if symbol not in self._available_symbols:
-                    self._available_symbols.append(symbol)
-                
-                self._cache_metadata[symbol] = {
-                    "symbol": symbol,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "filename": filename,
-                    "filepath": filepath,
-                    "candle_count": candle_count,
-                    "data_source": "Alpaca Historical",
-                    "time_range_full": f"{start_date} to {end_date}"
-                }
+            self._cache_metadata[symbol] = {
+                "symbol": symbol,
+                "start_date": start_date,
+                "end_date": end_date,
+                "filename": filename,
+                "filepath": os.path.join(self._cache_dir, filename),
+                "candle_count": -1,
+                "data_source": "Alpaca Historical",
+                "time_range_full": f"{start_date} to {end_date}"
+            }
         
         self._available_symbols.sort()
+        self._available_symbols_tuple = None
         print(f"📦 [HistoricalDataService] Found {len(self._available_symbols)} cached symbols: {self._available_symbols}")
     
-    def get_available_symbols(self) -> List[str]:
-        """Return list of symbols with cached data."""
-        return self._available_symbols.copy()
+    @staticmethod
+    def _parse_candle_file(filepath: str) -> Tuple[List[Dict], float]:
+        """Read and parse one cache file. Returns (candles, mtime)."""
+        fd = os.open(filepath, os.O_RDONLY)
+        if _FADVISE:
+            # Whole file is read front to back: let the kernel read ahead
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        with os.fdopen(fd, 'rb') as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+            data = _json.loads(f.read())
+        return data, mtime
+    
+    @classmethod
+    def _load_one_file(cls, filepath: str) -> Tuple[List[Dict], float, Optional[Exception]]:
+        """Scan worker: (candles, mtime, None) or ([], 0.0, error). No shared state."""
+        try:
+            data, mtime = cls._parse_candle_file(filepath)
+        except Exception as e:
+            return [], 0.0, e
+        return data, mtime, None
+    
+    def _store_candles(self, filepath: str, data: List[Dict], mtime: float):
+        """Cache parsed candles (and their range indices) for a file."""
+        range_starts = self._compute_range_starts(data)
+        with self._lock:
+            if filepath not in self._candle_cache and len(self._candle_cache) >= CANDLE_CACHE_MAX_ENTRIES:
+                oldest = next(iter(self._candle_cache))
+                del self._candle_cache[oldest]
+                del self._cache_mtime[oldest]
+                del self._range_starts[oldest]
+            self._candle_cache[filepath] = data
+            self._cache_mtime[filepath] = mtime
+            self._range_starts[filepath] = range_starts
+        return range_starts
+    
+    def _read_candles_indexed(self, filepath: str) -> Tuple[List[Dict], Optional[Dict[str, int]]]:
+        """
+        Return (candles, range_starts) for a cache file.
+        
+        The file is only re-parsed when its mtime differs from the one
+        recorded at the last parse. Callers must not mutate the returned list.
+        """
+        mtime = os.path.getmtime(filepath)
+        with self._lock:
+            if self._cache_mtime.get(filepath) == mtime:
+                return self._candle_cache[filepath], self._range_starts[filepath]
+        
+        data, mtime = self._parse_candle_file(filepath)
+        return data, self._store_candles(filepath, data, mtime)
+    
+    @classmethod
+    def _compute_range_starts(cls, candles: List[Dict]) -> Optional[Dict[str, int]]:
+        """
+        Index of the first candle inside each TIME_RANGES window.
+        
+        Windows end at the last candle's date and reach back
+        TIME_RANGE_DAYS days, matching the filter in load_historical_data.
+        """
+        dates = cls._build_date_index(candles)
+        if dates is None or not len(dates):
+            return None
+        last_date = dates[-1]
+        return {
+            key: int(np.searchsorted(
+                dates, last_date - np.timedelta64(days, "D"), side="left"
+            ))
+            for key, days in TIME_RANGE_DAYS.items()
+        }
+    
+    @staticmethod
+    def _build_date_index(candles: List[Dict]) -> Optional[np.ndarray]:
+        """
+        Day-resolution timestamp index for binary-searching range cutoffs.
+        
+        Returns None if any timestamp is missing/malformed or the candles
+        are not in ascending order, in which case callers filter linearly.
+        """
+        try:
+            dates = np.array(
+                [c.get("timestamp", "")[:10] for c in candles],
+                dtype="datetime64[D]"
+            )
+        except (ValueError, TypeError, AttributeError):
+            return None
+        if np.isnat(dates).any() or (dates[1:] < dates[:-1]).any():
+            return None
+        return dates
+    
+    def _fill_candle_counts(self, metas: List[Dict]):
+        """Parse the files behind metadata entries whose candle_count is unknown."""
+        pending = [meta for meta in metas if meta["candle_count"] == -1]
+        if not pending:
+            return
+        
+        # Read and parse files concurrently; store results in order
+        filepaths = [meta["filepath"] for meta in pending]
+        with ThreadPoolExecutor(max_workers=min(SCAN_MAX_WORKERS, len(filepaths))) as pool:
+            loaded = list(pool.map(self._load_one_file, filepaths))
+        
+        for meta, filepath, (data, mtime, error) in zip(pending, filepaths, loaded):
+            if error is None:
+                self._store_candles(filepath, data, mtime)
+                meta["candle_count"] = len(data)
+            else:
+                print(f"⚠️ [HistoricalDataService] Error reading {meta['filename']}: {error}")
+                meta["candle_count"] = 0
+    
+    def get_available_symbols(self) -> Tuple[str, ...]:
+        """Return symbols with cached data (sorted, immutable tuple)."""
+        if self._available_symbols_tuple is None:
+            self._available_symbols_tuple = tuple(self._available_symbols)
+        return self._available_symbols_tuple
     
     def get_symbol_metadata(self, symbol: str) -> Optional[Dict]:
         """Return metadata for a specific symbol's cached data."""
-        return self._cache_metadata.get(symbol)
+        meta = self._cache_metadata.get(symbol)
+        if meta is not None:
+            self._fill_candle_counts([meta])
+        return meta
+    
+    def get_file_mtime(self, symbol: str) -> Optional[float]:
+        """Modification time of the symbol's candle file (None if unknown)."""
+        meta = self._cache_metadata.get(symbol)
+        if meta is None:
+            return None
+        try:
+            return os.path.getmtime(meta["filepath"])
+        except OSError:
+            return None
     
     def get_all_metadata(self) -> Dict[str, Dict]:
         """Return metadata for all cached symbols."""
+        self._fill_candle_counts(list(self._cache_metadata.values()))
         return self._cache_metadata.copy()
     
     def load_historical_data(
@@ -126,7 +296,7 @@ class HistoricalDataService:
             return {
                 "status": "error",
                 "error": f"Symbol '{symbol}' not found in historical cache",
-                "available_symbols": self._available_symbols,
+                "available_symbols": self.get_available_symbols(),
                 "candles": [],
                 "metadata": None
             }
@@ -135,27 +305,34 @@ class HistoricalDataService:
         filepath = meta["filepath"]
         
         try:
-            with open(filepath, 'r') as f:
-                all_candles = json.load(f)
+            all_candles, range_starts = self._read_candles_indexed(filepath)
         except Exception as e:
+            if meta["candle_count"] == -1:
+                meta["candle_count"] = 0
             return {
                 "status": "error",
                 "error": f"Failed to load data: {str(e)}",
                 "candles": [],
                 "metadata": meta
             }
+        if meta["candle_count"] == -1:
+            meta["candle_count"] = len(all_candles)
         
         # Filter by time range from the END of the data
-        if time_range in TIME_RANGES:
-            months = TIME_RANGES[time_range]["months"]
+        if range_starts is not None and time_range in range_starts:
+            # Precomputed at parse time: a single slice
+            filtered_candles = all_candles[range_starts[time_range]:]
+        elif time_range in TIME_RANGE_DAYS:
+            days = TIME_RANGE_DAYS[time_range]
             # Calculate cutoff date from the last candle
             if all_candles:
                 # Parse last candle date
                 last_date_str = all_candles[-1].get("timestamp", "")[:10]
                 try:
-                    last_date = datetime.strptime(last_date_str, "%Y-%m-%d")
-                    cutoff_date = last_date - timedelta(days=months * 30)
-                    cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+                    last_date = np.datetime64(last_date_str, "D")
+                    if np.isnat(last_date):
+                        raise ValueError("missing timestamp")
+                    cutoff_str = str(last_date - np.timedelta64(days, "D"))
                     
                     # Filter candles
                     filtered_candles = [
@@ -163,18 +340,18 @@ class HistoricalDataService:
                         if c.get("timestamp", "")[:10] >= cutoff_str
                     ]
                 except Exception:
-                    filtered_candles = all_candles
+                    filtered_candles = list(all_candles)
             else:
-                filtered_candles = all_candles
+                filtered_candles = list(all_candles)
         else:
-            filtered_candles = all_candles
+            filtered_candles = list(all_candles)
         
         # Build response metadata
         response_meta = {
             "symbol": symbol,
             "data_source": "Alpaca Historical",
             "time_range": time_range,
-            "time_range_label": TIME_RANGES.get(time_range, {}).get("label", time_range),
+            "time_range_label": TIME_RANGE_LABELS.get(time_range, time_range),
             "candle_count": len(filtered_candles),
             "total_cached_candles": meta["candle_count"],
             "cache_start_date": meta["start_date"],
@@ -192,6 +369,19 @@ class HistoricalDataService:
             "metadata": response_meta
         }
     
+    def load_historical_data_batch(
+        self,
+        symbols: List[str],
+        time_range: str = "6M"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Load historical data for several symbols with one time range.
+        
+        Returns:
+            Dict of symbol -> load_historical_data() result
+        """
+        return {symbol: self.load_historical_data(symbol, time_range) for symbol in symbols}
+    
     def get_time_ranges(self) -> Dict[str, Dict]:
         """Return available time range options."""
         return TIME_RANGES.copy()
@@ -277,12 +467,7 @@ class HistoricalDataService:
         entry_price = entry_candle.get("close", current_price)
         
         # Map symbols to sectors
-        sector_map = {
-            "SPY": "INDEX",
-            "QQQ": "TECH",
-            "IWM": "SMALL_CAP"
-        }
-        sector = sector_map.get(symbol, "EQUITY")
+        sector = SYMBOL_SECTORS.get(symbol, "EQUITY")
         
         positions = [
             {
@@ -303,25 +488,23 @@ class HistoricalDataService:
         if len(candles) < 2:
             return 2.0  # Default fallback
         
-        true_ranges = []
-        for i in range(1, len(candles)):
-            high = candles[i].get("high", 0)
-            low = candles[i].get("low", 0)
-            prev_close = candles[i-1].get("close", 0)
+        # Only the last 'period' true ranges (last period+1 candles) matter
+        start = max(1, len(candles) - period)
+        prev_close = candles[start - 1].get("close", 0)
+        total = 0.0
+        for i in range(start, len(candles)):
+            candle = candles[i]
+            high = candle.get("high", 0)
+            low = candle.get("low", 0)
             
-            tr = max(
+            total += max(
                 high - low,
                 abs(high - prev_close),
                 abs(low - prev_close)
             )
-            true_ranges.append(tr)
+            prev_close = candle.get("close", 0)
         
-        if not true_ranges:
-            return 2.0
-        
-        # Use the last 'period' values
-        recent_tr = true_ranges[-period:] if len(true_ranges) >= period else true_ranges
-        return sum(recent_tr) / len(recent_tr)
+        return total / (len(candles) - start)
     
     def generate_sector_heatmap(self, symbol: str) -> Dict[str, int]:
         """
@@ -329,30 +512,28 @@ class HistoricalDataService:
         
         This provides context without using demo data.
         """
-        # Neutral baseline with emphasis on the selected symbol's sector
-        sector_map = {
-            "SPY": {"INDEX": 60, "TECH": 55, "HEALTHCARE": 50, "ENERGY": 45},
-            "QQQ": {"TECH": 70, "INDEX": 50, "HEALTHCARE": 45, "ENERGY": 40},
-            "IWM": {"SMALL_CAP": 55, "INDEX": 50, "TECH": 50, "ENERGY": 50}
-        }
-        
-        return sector_map.get(symbol, {"EQUITY": 50, "TECH": 50, "INDEX": 50})
+        # Copy so callers can't mutate the shared baseline
+        return dict(SECTOR_HEATMAPS.get(symbol, DEFAULT_SECTOR_HEATMAP))
 
 
 # Singleton instance for easy access
 _service_instance: Optional[HistoricalDataService] = None
+_service_lock = threading.Lock()
 
 
 def get_historical_service() -> HistoricalDataService:
     """Get or create the singleton HistoricalDataService instance."""
     global _service_instance
     if _service_instance is None:
-        _service_instance = HistoricalDataService()
+        with _service_lock:
+            # Double-checked: only one thread constructs and scans
+            if _service_instance is None:
+                _service_instance = HistoricalDataService()
     return _service_instance
 
 
 # Convenience functions
-def get_available_symbols() -> List[str]:
+def get_available_symbols() -> Tuple[str, ...]:
     """Get list of symbols with cached historical data."""
     return get_historical_service().get_available_symbols()
 
@@ -362,6 +543,16 @@ def load_historical_data(symbol: str, time_range: str = "6M") -> Dict[str, Any]:
     return get_historical_service().load_historical_data(symbol, time_range)
 
 
+def load_historical_data_batch(symbols: List[str], time_range: str = "6M") -> Dict[str, Dict[str, Any]]:
+    """Load historical data for several symbols with time range filtering."""
+    return get_historical_service().load_historical_data_batch(symbols, time_range)
+
+
+def get_file_mtime(symbol: str) -> Optional[float]:
+    """Modification time of a symbol's cached candle file."""
+    return get_historical_service().get_file_mtime(symbol)
+
+
 def get_time_ranges() -> Dict[str, Dict]:
     """Get available time range options."""
     return get_historical_service().get_time_ranges()
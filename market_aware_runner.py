@@ -12,16 +12,15 @@ STRICT DATA SOURCE RULES:
 - NO mixing sources
 """
 
-import os
+import copy
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-# Ensure backend directory is in path for imports
-_backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
-if _backend_dir not in sys.path:
-    sys.path.insert(0, _backend_dir)
-
 # Core decision engine modules
 import volatility_metrics
 import news_scorer
@@ -38,15 +37,70 @@ from data_router import (
     DATA_MODE_HISTORICAL
 )
 
+# Cache file versions key historical results
+from historical_data_service import get_file_mtime
+
 # Scenario support (for testing only)
-from scenarios import get_scenario
+from backend.scenarios import get_scenario
+
+# Completed analyses, least recently used first
+ANALYSIS_CACHE_MAX_ENTRIES = 256
+_result_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _get_cached_result(key: tuple) -> Optional[Dict[str, Any]]:
+    """Private copy of a cached analysis, or None on a miss."""
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is None:
+            return None
+        _result_cache.move_to_end(key)
+    # Cached entries are never mutated, so copying outside the lock is safe
+    return copy.deepcopy(result)
+
+
+def _store_result(key: tuple, result: Dict[str, Any]):
+    """Cache a private copy of an analysis, evicting the least recently used."""
+    snapshot = copy.deepcopy(result)
+    with _result_cache_lock:
+        _result_cache[key] = snapshot
+        _result_cache.move_to_end(key)
+        if len(_result_cache) > ANALYSIS_CACHE_MAX_ENTRIES:
+            _result_cache.popitem(last=False)
+
+
+def clear_analysis_cache():
+    """Drop all cached analyses (e.g. after the router is reset)."""
+    with _result_cache_lock:
+        _result_cache.clear()
+
+
+# Overlaps the four independent live fetches of a run. Shared by all runs:
+# the DataRouter getters only read router state in LIVE mode, and
+# AlpacaAdapter holds nothing but credentials/headers after __init__
+# (each call is its own requests.get), so concurrent calls are safe.
+_live_fetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="live-fetch")
+
+
+# Marks an override key that is absent (None is a valid override value)
+_MISSING = object()
+
+# Static rows of the run configuration box
+_BOX_TOP = "╔" + "═" * 58 + "╗"
+_BOX_TITLE = "║" + "MARKET-AWARE RUN CONFIGURATION".center(58) + "║"
+_BOX_RULE = "╠" + "═" * 58 + "╣"
+_BOX_EXECUTION = f"║  Execution         : {'DISABLED (Advisory Only)':<35}║"
+_BOX_BOTTOM = "╚" + "═" * 58 + "╝"
 
 
 def run_market_aware_analysis(
     scenario_id: Optional[str] = None,
     symbol: Optional[str] = None,
     time_range: Optional[str] = None,
-    crash_override: Optional[Dict[str, Any]] = None
+    crash_override: Optional[Dict[str, Any]] = None,
+    verbose: bool = True,
+    include_thought_log: bool = True
 ) -> Dict[str, Any]:
     """
     Run the full decision pipeline using market-aware data routing.
@@ -60,6 +114,8 @@ def run_market_aware_analysis(
         symbol: Optional symbol override (historical mode only)
         time_range: Optional time range (historical mode only)
         crash_override: Optional crash simulation context (UPGRADE 2)
+        verbose: Include signal explanations and the market status timestamp
+        include_thought_log: Record the reasoning trail (empty list if False)
     
     Returns:
         Complete analysis result with:
@@ -73,25 +129,27 @@ def run_market_aware_analysis(
     # =================================================================
     # UPGRADE 3: Initialize Thought Log
     # =================================================================
-    thought_log = []
-    thought_log.append("🧠 Agent initializing analysis pipeline...")
+    thought_log = ["🧠 Agent initializing analysis pipeline..."] if include_thought_log else []
     
     # Initialize data router
     router = get_data_router()
-    thought_log.append(f"📡 Data router initialized")
+    if include_thought_log:
+        thought_log.append(f"📡 Data router initialized")
     
     # Apply symbol/time_range if provided (only works in historical mode)
     if symbol:
         try:
             router.set_symbol(symbol)
-            thought_log.append(f"🎯 Symbol set to {symbol}")
+            if include_thought_log:
+                thought_log.append(f"🎯 Symbol set to {symbol}")
         except ValueError as e:
             print(f"⚠️ Symbol override ignored: {e}")
     
     if time_range:
         try:
             router.set_time_range(time_range)
-            thought_log.append(f"📅 Time range set to {time_range}")
+            if include_thought_log:
+                thought_log.append(f"📅 Time range set to {time_range}")
         except ValueError as e:
             print(f"⚠️ Time range override ignored: {e}")
     
@@ -99,37 +157,74 @@ def run_market_aware_analysis(
     routing_config = router.get_routing_config()
     data_mode = routing_config["data_mode"]
     is_open = routing_config["is_open"]
-    thought_log.append(f"📊 Market Status: {'OPEN' if is_open else 'CLOSED'} | Mode: {data_mode}")
+    market_status_label = routing_config["market_status"]
+    data_source = routing_config["data_source"]
+    selected_symbol = routing_config["selected_symbol"]
+    if include_thought_log:
+        thought_log.append(f"📊 Market Status: {'OPEN' if is_open else 'CLOSED'} | Mode: {data_mode}")
+    
+    # Repeat analyses are served from the result cache. Historical inputs
+    # are fixed per (symbol, range, candle file version); live results are
+    # reused within a minute. Scenario and crash runs are always recomputed.
+    cache_key = None
+    if scenario_id is None and crash_override is None:
+        cache_key = (
+            symbol, time_range,
+            selected_symbol, routing_config.get("selected_time_range"), data_mode,
+            int(time.time() // 60) if is_open else get_file_mtime(selected_symbol),
+            verbose, include_thought_log
+        )
+        cached = _get_cached_result(cache_key)
+        if cached is not None:
+            if verbose:
+                cached["market_status"]["timestamp"] = datetime.now().isoformat()
+            if include_thought_log:
+                cached["thought_log"].append("♻️ Inputs unchanged — reused the previous analysis")
+            return cached
     
     # Get data from appropriate source
-    market_data = router.get_market_data()
-    portfolio_data = router.get_portfolio_data()
-    sector_heatmap = router.get_sector_heatmap()
-    candidates = router.get_candidates()
-    thought_log.append(f"📦 Data loaded from {routing_config['data_source']}")
+    if is_open:
+        # Live fetches are independent network calls: overlap their waits
+        f_market = _live_fetch_pool.submit(router.get_market_data)
+        f_portfolio = _live_fetch_pool.submit(router.get_portfolio_data)
+        f_heatmap = _live_fetch_pool.submit(router.get_sector_heatmap)
+        f_candidates = _live_fetch_pool.submit(router.get_candidates)
+        market_data = f_market.result()
+        portfolio_data = f_portfolio.result()
+        sector_heatmap = f_heatmap.result()
+        candidates = f_candidates.result()
+    else:
+        # Historical data is served from memory; threads would only add overhead
+        market_data = router.get_market_data()
+        portfolio_data = router.get_portfolio_data()
+        sector_heatmap = router.get_sector_heatmap()
+        candidates = router.get_candidates()
+    if include_thought_log:
+        thought_log.append(f"📦 Data loaded from {data_source}")
     
     # Extract data components
     candles = market_data.get("candles", [])
     headlines = market_data.get("headlines", [])
     portfolio = portfolio_data.get("portfolio", {})
     positions = portfolio_data.get("positions", [])
-    thought_log.append(f"📈 Processing {len(candles)} candles, {len(positions)} positions")
+    if include_thought_log:
+        thought_log.append(f"📈 Processing {len(candles)} candles, {len(positions)} positions")
     
     # Handle scenario overrides (for testing)
     scenario = get_scenario(scenario_id) if scenario_id else {}
-    overrides = scenario.get("override_inputs", {})
+    # Copied: the crash override below adds keys, and must not leak into SCENARIOS
+    overrides = dict(scenario.get("override_inputs", ()))
     
     if overrides:
-        if "positions" in overrides:
-            positions = overrides["positions"]
-        if "candidates" in overrides:
-            candidates = overrides["candidates"]
+        positions = overrides.get("positions", positions)
+        candidates = overrides.get("candidates", candidates)
     
     # =================================================================
     # UPGRADE 2: Apply Crash Simulation Override
     # =================================================================
     if crash_override:
-        thought_log.append("🚨 CRASH SIMULATION ACTIVE — Volatility override engaged")
+        if include_thought_log:
+            thought_log.append("🚨 CRASH SIMULATION ACTIVE — Volatility override engaged")
         if "force_volatility_state" in crash_override:
             overrides["volatility_state"] = crash_override["force_volatility_state"]
         if "force_news_score" in crash_override:
@@ -138,7 +233,8 @@ def run_market_aware_analysis(
             overrides["sector_confidence"] = crash_override["force_sector_confidence"]
     
     # Compute signals from data
-    thought_log.append("📊 Analyzing volatility regime...")
+    if include_thought_log:
+        thought_log.append("📊 Analyzing volatility regime...")
     if candles:
         atr_res = volatility_metrics.compute_atr(candles)
         baseline_atr = 2.5
@@ -150,31 +246,26 @@ def run_market_aware_analysis(
     else:
         vol_state = "STABLE"
     
-    thought_log.append(f"📉 Volatility state: {vol_state}")
-    
-    thought_log.append("📰 Processing news sentiment...")
+    if include_thought_log:
+        thought_log.extend((
+            f"📉 Volatility state: {vol_state}",
+            "📰 Processing news sentiment..."
+        ))
     if headlines:
         news_res = news_scorer.score_tech_news(headlines)
         news_score_val = news_res.get("news_score", 50)
     else:
         news_score_val = 50  # Neutral when no headlines
     
-    thought_log.append(f"📰 News score: {news_score_val}/100")
-    
-    thought_log.append("🎯 Computing sector confidence...")
+    if include_thought_log:
+        thought_log.extend((
+            f"📰 News score: {news_score_val}/100",
+            "🎯 Computing sector confidence..."
+        ))
     conf_res = sector_confidence.compute_sector_confidence(vol_state, news_score_val)
     confidence_val = conf_res.get("sector_confidence", 50)
-    thought_log.append(f"🎯 Sector confidence: {confidence_val}/100")
-    
-    # Apply scenario overrides to signals
-    if "volatility_state" in overrides:
-        vol_state = overrides["volatility_state"]
-        thought_log.append(f"⚡ Volatility OVERRIDE: {vol_state}")
-    if "news_score" in overrides:
-        news_score_val = overrides["news_score"]
-        thought_log.append(f"⚡ News score OVERRIDE: {news_score_val}")
-    if "sector_confidence" in overrides:
-        confidence_val = overrides["sector_confidence"]
+    if include_thought_log:
+        thought_log.append(f"🎯 Sector confidence: {confidence_val}/100")
     
     # Build market context for decision engine
     market_context = {
@@ -182,23 +273,35 @@ def run_market_aware_analysis(
         "news": headlines
     }
     
-    if "volatility_state" in overrides:
-        market_context["override_volatility"] = overrides["volatility_state"]
-    if "news_score" in overrides:
-        market_context["override_news_score"] = overrides["news_score"]
-    if "sector_confidence" in overrides:
-        market_context["override_confidence"] = overrides["sector_confidence"]
+    # Apply scenario overrides to signals and market context
+    vol_override = overrides.get("volatility_state", _MISSING)
+    if vol_override is not _MISSING:
+        vol_state = vol_override
+        market_context["override_volatility"] = vol_override
+        if include_thought_log:
+            thought_log.append(f"⚡ Volatility OVERRIDE: {vol_state}")
+    news_override = overrides.get("news_score", _MISSING)
+    if news_override is not _MISSING:
+        news_score_val = news_override
+        market_context["override_news_score"] = news_override
+        if include_thought_log:
+            thought_log.append(f"⚡ News score OVERRIDE: {news_score_val}")
+    confidence_override = overrides.get("sector_confidence", _MISSING)
+    if confidence_override is not _MISSING:
+        confidence_val = confidence_override
+        market_context["override_confidence"] = confidence_override
     
     # Build execution context
     execution_context = {
         "system_mode": "PAPER (Advisory)" if is_open else "VALIDATION (Historical)",
-        "market_status": routing_config["market_status"],
+        "market_status": market_status_label,
         "data_feed_mode": data_mode,
-        "data_capability": routing_config["data_source"]
+        "data_capability": data_source
     }
     
     # Run decision engine
-    thought_log.append("🧠 Running decision engine...")
+    if include_thought_log:
+        thought_log.append("🧠 Running decision engine...")
     decision_report = decision_engine.run_decision_engine(
         portfolio_state=portfolio,
         positions=positions,
@@ -206,7 +309,7 @@ def run_market_aware_analysis(
         candidates=candidates,
         market_context=market_context,
         execution_context=execution_context,
-        thought_log=thought_log  # UPGRADE 3: Pass thought_log
+        thought_log=thought_log if include_thought_log else None  # UPGRADE 3: Pass thought_log
     )
     
     # Extract components
@@ -215,15 +318,24 @@ def run_market_aware_analysis(
     blocked_decisions = decision_report.get("blocked_by_safety", [])
     concentration_risk = decision_report.get("concentration_risk", {})
     
-    thought_log.append(f"📋 Market posture determined: {posture.get('market_posture', 'N/A')}")
-    thought_log.append(f"⚠️ Risk level: {posture.get('risk_level', 'N/A')}")
-    thought_log.append(f"✅ Allowed decisions: {len(safe_decisions)}")
+    if include_thought_log:
+        thought_log.extend((
+            f"📋 Market posture determined: {posture.get('market_posture', 'N/A')}",
+            f"⚠️ Risk level: {posture.get('risk_level', 'N/A')}",
+            f"✅ Allowed decisions: {len(safe_decisions)}"
+        ))
     if blocked_decisions:
-        thought_log.append(f"🛡️ Blocked by safety: {len(blocked_decisions)} actions")
+        if include_thought_log:
+            thought_log.append(f"🛡️ Blocked by safety: {len(blocked_decisions)} actions")
     
     # Calculate average vitals
-    pos_scores = [d["score"] for d in safe_decisions if d["type"] == "POSITION"]
-    avg_vitals = int(sum(pos_scores) / len(pos_scores)) if pos_scores else 0
+    score_total = 0
+    score_count = 0
+    for d in safe_decisions:
+        if d["type"] == "POSITION":
+            score_total += d["score"]
+            score_count += 1
+    avg_vitals = int(score_total / score_count) if score_count else 0
     
     # Generate execution plan
     if safe_decisions:
@@ -242,17 +354,26 @@ def run_market_aware_analysis(
     summary = execution_summary.generate_execution_summary(summary_context)
     
     # Build analysis result
-    thought_log.append("📝 Generating final analysis report...")
-    analysis_result = {
-        # Phase 2 Signals
-        "signals": {
+    if include_thought_log:
+        thought_log.append("📝 Generating final analysis report...")
+    if verbose:
+        signals = {
             "volatility_state": vol_state,
             "volatility_explanation": f"Computed from {len(candles)} candles",
             "news_score": news_score_val,
             "news_explanation": f"Processed {len(headlines)} headlines" if headlines else "No headlines (neutral)",
             "sector_confidence": confidence_val,
             "confidence_explanation": "Combined signals"
-        },
+        }
+    else:
+        signals = {
+            "volatility_state": vol_state,
+            "news_score": news_score_val,
+            "sector_confidence": confidence_val
+        }
+    analysis_result = {
+        # Phase 2 Signals
+        "signals": signals,
         # Phase 3 Decisions
         "market_posture": posture,
         "decisions": safe_decisions,
@@ -277,22 +398,25 @@ def run_market_aware_analysis(
         }
     }
     
+    market_status = {
+        "label": market_status_label,
+        "is_open": is_open
+    }
+    if verbose:
+        market_status["timestamp"] = datetime.now().isoformat()
+    
     # Build full response
-    return {
+    response = {
         # Market Status & Routing
-        "market_status": {
-            "label": routing_config["market_status"],
-            "is_open": is_open,
-            "timestamp": datetime.now().isoformat()
-        },
+        "market_status": market_status,
         "data_mode": data_mode,
-        "data_source": routing_config["data_source"],
+        "data_source": data_source,
         "portfolio_source": data_mode,
-        "symbols_used": [routing_config["selected_symbol"]],
+        "symbols_used": [selected_symbol],
         
         # Routing Configuration (for frontend controls)
         "routing_config": {
-            "selected_symbol": routing_config["selected_symbol"],
+            "selected_symbol": selected_symbol,
             "selected_time_range": routing_config.get("selected_time_range"),
             "available_symbols": routing_config.get("available_symbols", []),
             "available_time_ranges": routing_config.get("available_time_ranges", {}),
@@ -311,33 +435,49 @@ def run_market_aware_analysis(
         # Analysis Results
         "analysis": analysis_result
     }
+    
+    # Degraded runs (a failed fetch or no candles) are never replayed
+    fetch_failed = (
+        market_data.get("status") == "error"
+        or portfolio_data.get("status") == "error"
+        or not candles
+    )
+    if cache_key is not None and not fetch_failed:
+        _store_result(cache_key, response)
+    return response
 
 
 def print_run_configuration(routing_config: Dict[str, Any]):
     """Print clear, honest capability disclosure at startup."""
-    print()
-    print("╔" + "═" * 58 + "╗")
-    print("║" + "MARKET-AWARE RUN CONFIGURATION".center(58) + "║")
-    print("╠" + "═" * 58 + "╣")
-    print(f"║  Market Status     : {routing_config['market_status']:<35}║")
-    print(f"║  Data Mode         : {routing_config['data_mode']:<35}║")
-    print(f"║  Data Source       : {routing_config['data_source']:<35}║")
-    print(f"║  Selected Symbol   : {routing_config['selected_symbol']:<35}║")
+    lines = [
+        "",
+        _BOX_TOP,
+        _BOX_TITLE,
+        _BOX_RULE,
+        f"║  Market Status     : {routing_config['market_status']:<35}║",
+        f"║  Data Mode         : {routing_config['data_mode']:<35}║",
+        f"║  Data Source       : {routing_config['data_source']:<35}║",
+        f"║  Selected Symbol   : {routing_config['selected_symbol']:<35}║",
+    ]
     
     if routing_config.get('selected_time_range'):
-        print(f"║  Time Range        : {routing_config['selected_time_range']:<35}║")
+        lines.append(f"║  Time Range        : {routing_config['selected_time_range']:<35}║")
     
-    print(f"║  Execution         : {'DISABLED (Advisory Only)':<35}║")
-    print("╚" + "═" * 58 + "╝")
+    lines.append(_BOX_EXECUTION)
+    lines.append(_BOX_BOTTOM)
     
     if not routing_config['is_open']:
-        print(f"\n📊 HISTORICAL VALIDATION MODE")
-        print("   Market is closed. System is operating on Alpaca historical")
-        print("   market data to validate decision logic over extended periods.")
+        lines.append(f"\n📊 HISTORICAL VALIDATION MODE")
+        lines.append("   Market is closed. System is operating on Alpaca historical")
+        lines.append("   market data to validate decision logic over extended periods.")
     else:
-        print(f"\n🔴 LIVE MODE")
-        print("   Market is open. Using live data from Alpaca + Polygon.")
-    print()
+        lines.append(f"\n🔴 LIVE MODE")
+        lines.append("   Market is open. Using live data from Alpaca + Polygon.")
+    lines.append("")
+    
+    # One write for the whole banner instead of a print() per line
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
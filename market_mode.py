@@ -11,8 +11,27 @@ upgrades to live data when available.
 """
 
 import os
+import time
 import datetime
-from typing import Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+# Alpaca SDK for the authoritative market clock (optional). Imported on
+# the first status check that has credentials, then kept: importing
+# market_mode stays cheap, and later checks skip the import machinery.
+_UNRESOLVED = object()
+_tradeapi = _UNRESOLVED
+
+
+def _get_tradeapi():
+    """The alpaca_trade_api module, or None if it isn't installed."""
+    global _tradeapi
+    if _tradeapi is _UNRESOLVED:
+        try:
+            import alpaca_trade_api
+            _tradeapi = alpaca_trade_api
+        except ImportError:
+            _tradeapi = None
+    return _tradeapi
 
 # Try to import zoneinfo or pytz for timezones
 try:
@@ -26,26 +45,42 @@ except ImportError:
         # Fallback for systems without timezone lib (not ideal but functional)
         eastern_tz = None
 
-_cached_status = None
+# (expiry on the time.monotonic() clock, status payload)
+_cached_status: Optional[Tuple[float, Dict[str, str]]] = None
+
+# Seconds a computed status stays valid. An open market is re-checked
+# sooner so the close is picked up promptly.
+STATUS_TTL_OPEN = 30
+STATUS_TTL_CLOSED = 60
+
 
 def get_market_status() -> Dict[str, str]:
     """
     Determines if the US stock market is currently open.
-    Computed ONCE per run to avoid mid-run switching.
+    Cached for STATUS_TTL_OPEN / STATUS_TTL_CLOSED seconds, so a
+    long-running process follows the open and close.
     """
     global _cached_status
-    if _cached_status:
-        return _cached_status
+    if _cached_status and time.monotonic() < _cached_status[0]:
+        return _cached_status[1]
+
+    status = _compute_market_status()
+    ttl = STATUS_TTL_OPEN if status["status"] == "OPEN" else STATUS_TTL_CLOSED
+    _cached_status = (time.monotonic() + ttl, status)
+    return status
 
+
+def _compute_market_status() -> Dict[str, str]:
+    """Uncached market status (Alpaca clock, else local exchange hours)."""
     now_utc = datetime.datetime.now(datetime.timezone.utc)
     
     # Check if Alpaca API is available to get authoritative clock
     api_key = os.environ.get("ALPACA_API_KEY")
     secret_key = os.environ.get("ALPACA_SECRET_KEY")
     
-    if api_key and secret_key:
+    tradeapi = _get_tradeapi() if api_key and secret_key else None
+    if tradeapi is not None:
         try:
-            import alpaca_trade_api as tradeapi
             base_url = os.environ.get("ALPACA_BASE_URL", "https://paper-api.alpaca.markets")
             api = tradeapi.REST(api_key, secret_key, base_url, api_version='v2')
             clock = api.get_clock()
@@ -53,12 +88,11 @@ def get_market_status() -> Dict[str, str]:
             status = "OPEN" if clock.is_open else "CLOSED"
             reason = "Market is Open" if clock.is_open else "Market is Closed (Alpaca Clock)"
             
-            _cached_status = {
+            return {
                 "status": status,
                 "reason": reason,
                 "timestamp": now_utc.isoformat()
             }
-            return _cached_status
         except Exception:
             # Fallback to local calculation if API fails
             pass
@@ -72,44 +106,44 @@ def get_market_status() -> Dict[str, str]:
 
     # 1. Check Weekend
     if now_et.weekday() >= 5: # 5=Sat, 6=Sun
-        _cached_status = {
+        return {
             "status": "CLOSED",
             "reason": "Weekend",
             "timestamp": now_utc.isoformat()
         }
-    else:
-        # 2. Check Hours (09:30 - 16:00 ET)
-        current_time = now_et.time()
-        market_open = datetime.time(9, 30)
-        market_close = datetime.time(16, 0)
-        
-        if current_time < market_open:
-            _cached_status = {
-                "status": "CLOSED",
-                "reason": "Pre-market",
-                "timestamp": now_utc.isoformat()
-            }
-        elif current_time > market_close:
-            _cached_status = {
-                "status": "CLOSED",
-                "reason": "After hours",
-                "timestamp": now_utc.isoformat()
-            }
-        else:
-            _cached_status = {
-                "status": "OPEN",
-                "reason": "Market Open (Local Time)",
-                "timestamp": now_utc.isoformat()
-            }
-            
-    return _cached_status
+
+    # 2. Check Hours (09:30 - 16:00 ET)
+    current_time = now_et.time()
+    market_open = datetime.time(9, 30)
+    market_close = datetime.time(16, 0)
+    
+    if current_time < market_open:
+        return {
+            "status": "CLOSED",
+            "reason": "Pre-market",
+            "timestamp": now_utc.isoformat()
+        }
+    if current_time > market_close:
+        return {
+            "status": "CLOSED",
+            "reason": "After hours",
+            "timestamp": now_utc.isoformat()
+        }
+    return {
+        "status": "OPEN",
+        "reason": "Market Open (Local Time)",
+        "timestamp": now_utc.isoformat()
+    }
 
 
-def determine_execution_context() -> Dict[str, str]:
+def determine_execution_context(market_info: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
     """
     Decides the precise execution context.
     Differentiates between System Deployment Mode and actual Data Connectivity.
     
+    `market_info` is a get_market_status() snapshot to derive the context
+    from (fetched if not given).
+    
     Strict Mapping:
     - OPEN   => LIVE
     - CLOSED => HISTORICAL
@@ -119,7 +153,8 @@ def determine_execution_context() -> Dict[str, str]:
     - market_status:   OPEN vs CLOSED
     - data_feed_mode:  LIVE vs HISTORICAL
     """
-    market_info = get_market_status()
+    if market_info is None:
+        market_info = get_market_status()
     market_status = market_info["status"]
     
     # Check Credentials
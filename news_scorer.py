@@ -11,6 +11,28 @@ Rules:
 - Output normalized to 0-100.
 """
 
+from functools import lru_cache
+
+# Configuration (Refinable)
+STARTING_SCORE = 50
+POINT_WEIGHT = 5
+MAX_SCORE = 100
+MIN_SCORE = 0
+
+# Keyword Definitions (Tech Focused). Tuples: only iterated, never probed.
+POSITIVE_KEYWORDS = (
+    "growth", "demand", "beats", "rally", "soar", "surge",
+    "upgrade", "strong", "record", "bullish", "profit",
+    "innovation", "breakthrough", "high", "jump"
+)
+
+NEGATIVE_KEYWORDS = (
+    "slowdown", "risk", "regulation", "crash", "slump",
+    "downgrade", "weak", "miss", "volatility", "concern",
+    "inflation", "drop", "bearish", "loss", "decline", "warns"
+)
+
+
 def score_tech_news(headlines: list[str]) -> dict:
     """
     Scores a list of Technology sector headlines based on fixed keywords.
@@ -30,25 +52,16 @@ def score_tech_news(headlines: list[str]) -> dict:
             "headline_count": 0
         }
 
-    # Configuration (Refinable)
-    STARTING_SCORE = 50
-    POINT_WEIGHT = 5
-    MAX_SCORE = 100
-    MIN_SCORE = 0
-
-    # Keyword Definitions (Tech Focused)
-    POSITIVE_KEYWORDS = {
-        "growth", "demand", "beats", "rally", "soar", "surge", 
-        "upgrade", "strong", "record", "bullish", "profit", 
-        "innovation", "breakthrough", "high", "jump"
-    }
+    # Same headlines always score the same: memoize on the tuple
+    try:
+        return dict(_score_headlines(tuple(headlines)))
+    except TypeError:
+        return _score_headlines.__wrapped__(headlines)
 
-    NEGATIVE_KEYWORDS = {
-        "slowdown", "risk", "regulation", "crash", "slump", 
-        "downgrade", "weak", "miss", "volatility", "concern",
-        "inflation", "drop", "bearish", "loss", "decline", "warns"
-    }
 
+@lru_cache(maxsize=128)
+def _score_headlines(headlines: tuple) -> dict:
+    """Keyword scoring for a non-empty headline sequence."""
     current_score = STARTING_SCORE
 
     for headline in headlines:
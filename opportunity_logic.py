@@ -41,19 +41,24 @@ def scan_for_opportunities(positions: list, candidates: list, threshold: float =
     # ---------------------------------------------------------
     # 1. Analyze Current Portfolio (Find the Floor)
     # ---------------------------------------------------------
+    # For reporting purposes we also track the best held score,
+    # but the swap logic relies on the worst.
     if not positions:
         weakest_position = None
         min_vitals = 999.0  # Arbitrary high start
+        best_held_score = 0.0
     else:
-        # Find position with minimum vitals_score
-        weakest_position = min(positions, key=lambda x: x.get("vitals_score", 0))
-        min_vitals = float(weakest_position.get("vitals_score", 0))
-
-    # For reporting purposes, we might also want the best held, 
-    # but the swap logic relies on the worst.
-    best_held_score = 0.0
-    if positions:
-        best_held_score = max([p.get("vitals_score", 0) for p in positions])
+        # Single pass: position with minimum vitals_score (first on ties)
+        # and the maximum vitals_score
+        weakest_position = positions[0]
+        lowest = best_held_score = weakest_position.get("vitals_score", 0)
+        for p in positions[1:]:
+            score = p.get("vitals_score", 0)
+            if score < lowest:
+                lowest, weakest_position = score, p
+            if score > best_held_score:
+                best_held_score = score
+        min_vitals = float(lowest)
 
     # ---------------------------------------------------------
     # 2. Analyze External Opportunities (Find the Ceiling)
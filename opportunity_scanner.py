@@ -21,17 +21,77 @@ Author: Quantitative Portfolio Engineering Team
 """
 
 import os
+import time
+import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import datetime
-from typing import List, Dict, Any
+import functools
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import orjson
 
-# Configure logging
-logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# On-disk candle cache (repeat runs within the TTL skip the Polygon call)
+CANDLE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "polygon")
+CANDLE_CACHE_TTL = 300  # seconds
+CANDLE_CACHE_STALE_TTL = 24 * 3600  # last-known candles served during outages
+CANDLE_CACHE_EMPTY_TTL = 60  # known-empty results are not re-fetched for this long
+
+# Polygon Aggregates API: /v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from}/{to}
+POLYGON_AGGS_URL = (
+    "https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start}/{end}"
+)
+
+# Polygon Snapshot API: latest bars for many tickers in one request
+POLYGON_SNAPSHOT_URL = "https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/tickers"
+
+# Polygon request timeouts (seconds): connect, read
+POLYGON_CONNECT_TIMEOUT = 1.0
+POLYGON_READ_TIMEOUT = 3.0
+
+# All Polygon requests share one pooled session so TCP/TLS connections to
+# api.polygon.io are reused across calls and threads. Rate limits (429)
+# and transient 5xx are retried with exponential backoff; once retries
+# run out the last response is returned and handled like any non-200.
+# Connect/read failures are NOT retried, so the timeouts above still bound
+# a hanging call, and Retry-After is ignored to keep the backoff bounded.
+SECTOR_FETCH_MAX_WORKERS = 8
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        connect=0,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    ),
+))
+
+
+def configure_logging(level: int = logging.ERROR) -> None:
+    """
+    Configure root logging for command-line runs.
+
+    Idempotent: does nothing if the root logger already has handlers,
+    so repeated calls never install duplicate handlers.
+    """
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=level, format='%(asctime)s - %(levelname)s - %(message)s')
+
 
-def fetch_tech_sector_candles(limit: int = 50) -> List[Dict[str, Any]]:
+def fetch_tech_sector_candles(limit: int = 50, timeout: float = POLYGON_READ_TIMEOUT,
+                              use_cache: bool = False) -> List[Dict[str, Any]]:
     """
     Fetches 15-minute OHLC candles for the Technology sector ETF (XLK)
     using Polygon's Aggregates API.
@@ -41,6 +101,10 @@ def fetch_tech_sector_candles(limit: int = 50) -> List[Dict[str, Any]]:
     Args:
         limit (int): Approximate number of most recent candles to return.
                      Defaults to 50.
+        timeout (float): Read timeout for the Polygon request in seconds.
+                         The connect timeout is POLYGON_CONNECT_TIMEOUT.
+        use_cache (bool): Serve from the on-disk candle cache when fresh
+                          (see cached_fetch_tech_sector_candles).
 
     Returns:
         List[Dict[str, Any]]: List of dictionaries containing:
@@ -55,31 +119,36 @@ def fetch_tech_sector_candles(limit: int = 50) -> List[Dict[str, Any]]:
         
     Error Handling:
         - Missing API key: Logs error, returns []
-        - Network failure: Logs error, returns []
+        - Network failure / timeout: Logs error, returns []
         - Invalid response: Logs error, returns []
         - Malformed data: Skips record, continues processing
     """
+    if use_cache:
+        return cached_fetch_tech_sector_candles(limit=limit, timeout=timeout)
+    return fetch_sector_candles("XLK", limit=limit, timeout=timeout)
+
+
+def fetch_sector_candles(ticker: str, limit: int = 50,
+                         timeout: float = POLYGON_READ_TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    Fetches 15-minute OHLC candles for one sector ETF (e.g. XLK, XLF).
+
+    Same contract as fetch_tech_sector_candles(): ascending candles,
+    [] on any error or failure.
+    """
     api_key = os.environ.get("POLYGON_API_KEY")
     if not api_key:
         logger.error("POLYGON_API_KEY environment variable is not set.")
         return []
 
-    ticker = "XLK"
     multiplier = 15
     timespan = "minute"
     
-    # Calculate date range
-    # We request a generous buffer (last 5 days) to ensure we get enough 15-min candles
-    # even over weekends or holidays.
-    end_date = datetime.datetime.now(datetime.timezone.utc)
-    start_date = end_date - datetime.timedelta(days=5)
-
-    from_str = start_date.strftime("%Y-%m-%d")
-    to_str = end_date.strftime("%Y-%m-%d")
+    from_str, to_str = _polygon_date_range(int(time.time()) // 86400)
 
-    # Construct URL
-    # Polygon API Format: /v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from}/{to}
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_str}/{to_str}"
+    url = POLYGON_AGGS_URL.format(
+        ticker=ticker, multiplier=multiplier, timespan=timespan, start=from_str, end=to_str
+    )
     
     params = {
         "adjusted": "true",
@@ -89,63 +158,302 @@ def fetch_tech_sector_candles(limit: int = 50) -> List[Dict[str, Any]]:
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = _session.get(url, params=params, timeout=(POLYGON_CONNECT_TIMEOUT, timeout))
         
         if response.status_code != 200:
-            logger.error(f"Polygon API failed with status {response.status_code}: {response.text}")
+            logger.error("Polygon API failed with status %s: %s", response.status_code, response.text)
             return []
             
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Defensive check for list results
         results = data.get("results", [])
         if not isinstance(results, list) or not results:
-            logger.warning(f"Polygon API returned no results for {ticker}")
+            logger.warning("Polygon API returned no results for %s", ticker)
             return []
 
-        parsed_candles = []
-        for r in results:
-            # Defensive check for required fields
-            # 'o' = Open, 'h' = High, 'l' = Low, 'c' = Close, 't' = Timestamp (ms)
-            if not all(k in r for k in ("o", "h", "l", "c", "t")):
-                continue
-                
-            try:
-                # Convert timestamp (ms) to ISO UTC string
-                ts_ms = r["t"]
-                # Enforce float conversion for prices
-                candle = {
-                    "open": float(r["o"]),
-                    "high": float(r["h"]),
-                    "low": float(r["l"]),
-                    "close": float(r["c"]),
-                    "timestamp": datetime.datetime.fromtimestamp(
-                        ts_ms / 1000.0, tz=datetime.timezone.utc
-                    ).isoformat()
-                }
-                parsed_candles.append(candle)
-            except (ValueError, TypeError) as e:
-                # Skip individual malformed records but keep processing valid ones
-                logger.warning(f"Skipping malformed candle data: {r} - Error: {e}")
-                continue
-        
-        # Ensure sorting: Oldest -> Newest
-        parsed_candles.sort(key=lambda x: x["timestamp"])
-
-        # Return the most recent 'limit' candles
+        # Most recent 'limit' candles, oldest -> newest
         # If we have fewer than limit, return all we have
-        return parsed_candles[-limit:]
+        return _parse_polygon_results(results, limit)
 
+    except requests.exceptions.Timeout as e:
+        logger.error("Polygon request timed out for %s: %s", ticker, e)
+        return []
     except requests.exceptions.RequestException as e:
-        logger.error(f"Network error fetching Polygon data for {ticker}: {e}")
+        logger.error("Network error fetching Polygon data for %s: %s", ticker, e)
         return []
     except ValueError as e:
-        logger.error(f"JSON decoding failed for {ticker}: {e}")
+        logger.error("JSON decoding failed for %s: %s", ticker, e)
+        return []
+    except Exception as e:
+        logger.error("Unexpected error in fetch_sector_candles for %s: %s", ticker, e)
         return []
+
+
+@functools.lru_cache(maxsize=4)
+def _polygon_date_range(utc_day: int) -> Tuple[str, str]:
+    """
+    (from, to) date strings for the request window ending on `utc_day`
+    (days since the epoch, UTC). Only changes once a day, so it's memoized.
+    """
+    # We request a generous buffer (last 5 days) to ensure we get enough 15-min candles
+    # even over weekends or holidays.
+    end_date = datetime.datetime.fromtimestamp(utc_day * 86400, tz=datetime.timezone.utc)
+    start_date = end_date - datetime.timedelta(days=5)
+    return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+
+def fetch_sectors_parallel(tickers: List[str], limit: int = 50,
+                           timeout: float = POLYGON_READ_TIMEOUT) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch candles for several sector ETFs concurrently.
+
+    Returns {ticker: candles}; a failed ticker maps to [] like
+    fetch_sector_candles(). Wall time is roughly one round-trip rather
+    than one per ticker.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+
+    def _fetch_one(ticker: str) -> List[Dict[str, Any]]:
+        return fetch_sector_candles(ticker, limit=limit, timeout=timeout)
+
+    with ThreadPoolExecutor(max_workers=min(SECTOR_FETCH_MAX_WORKERS, len(tickers))) as ex:
+        return dict(zip(tickers, ex.map(_fetch_one, tickers)))
+
+
+def fetch_sector_snapshot(tickers: List[str],
+                          timeout: float = POLYGON_READ_TIMEOUT) -> Dict[str, Dict[str, Any]]:
+    """
+    Latest minute bar for several tickers in a single Polygon request.
+
+    Uses the snapshot endpoint, so N tickers cost one round-trip. It only
+    carries the current bar, not candle history; use fetch_sector_candles()
+    / fetch_sectors_parallel() when a candle series is needed.
+
+    Returns:
+        {ticker: candle} with the same candle shape as fetch_sector_candles().
+        Tickers without a usable bar are omitted; {} on any error or failure.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+
+    api_key = os.environ.get("POLYGON_API_KEY")
+    if not api_key:
+        logger.error("POLYGON_API_KEY environment variable is not set.")
+        return {}
+
+    params = {"tickers": ",".join(tickers), "apiKey": api_key}
+
+    try:
+        response = _session.get(POLYGON_SNAPSHOT_URL, params=params,
+                                timeout=(POLYGON_CONNECT_TIMEOUT, timeout))
+
+        if response.status_code != 200:
+            logger.error("Polygon snapshot failed with status %s: %s", response.status_code, response.text)
+            return {}
+
+        entries = orjson.loads(response.content).get("tickers") or []
+        if not isinstance(entries, list):
+            logger.warning("Polygon snapshot returned no tickers for %s", params["tickers"])
+            return {}
+
+        snapshot = {}
+        for entry in entries:
+            # 'min' = most recent minute bar (same o/h/l/c/t fields as aggregates)
+            bar = entry.get("min") if isinstance(entry, dict) else None
+            if not isinstance(bar, dict):
+                continue
+            candles = _parse_polygon_results([bar], 1)
+            if candles:
+                snapshot[entry.get("ticker", "")] = candles[0]
+        return snapshot
+
+    except requests.exceptions.Timeout as e:
+        logger.error("Polygon snapshot timed out for %s: %s", params["tickers"], e)
+        return {}
+    except requests.exceptions.RequestException as e:
+        logger.error("Network error fetching Polygon snapshot for %s: %s", params["tickers"], e)
+        return {}
+    except ValueError as e:
+        logger.error("JSON decoding failed for snapshot %s: %s", params["tickers"], e)
+        return {}
     except Exception as e:
-        logger.error(f"Unexpected error in fetch_tech_sector_candles: {e}")
+        logger.error("Unexpected error in fetch_sector_snapshot: %s", e)
+        return {}
+
+
+def _is_sorted_by_timestamp(candles: List[Dict[str, Any]]) -> bool:
+    """True if candles are already ordered oldest -> newest."""
+    return all(a["timestamp"] <= b["timestamp"] for a, b in zip(candles, candles[1:]))
+
+
+def _latest_candles(candles: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    The most recent `limit` candles, oldest -> newest.
+
+    Polygon honours sort=asc, so the tail slice is normally enough;
+    only an out-of-order response pays for a bounded top-K pass.
+    """
+    if _is_sorted_by_timestamp(candles):
+        return candles[-limit:]
+    return heapq.nlargest(limit, candles, key=lambda c: c["timestamp"])[::-1]
+
+
+# Polygon aggregate record as one packed row (t = epoch milliseconds)
+_POLYGON_ROW_DTYPE = np.dtype([
+    ("o", np.float64), ("h", np.float64), ("l", np.float64), ("c", np.float64),
+    ("t", np.float64),
+])
+_POLYGON_ROW_KEYS = frozenset(("o", "h", "l", "c", "t"))
+
+
+def _parse_polygon_results(results: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Convert Polygon aggregate records to the latest `limit` candle dicts.
+
+    Records are packed into one structured NumPy array, ordered and
+    trimmed there, and only the surviving rows become dicts. If the batch
+    can't be packed cleanly (bad values, non-integer or sub-second
+    timestamps), the per-record path is used instead, which skips
+    malformed records individually.
+    """
+    # 'o' = Open, 'h' = High, 'l' = Low, 'c' = Close, 't' = Timestamp (ms)
+    complete = [r for r in results if _POLYGON_ROW_KEYS <= r.keys()]
+    if not complete:
+        return []
+
+    try:
+        if {type(r["t"]) for r in complete} != {int}:
+            raise ValueError("timestamps need per-record conversion")
+        rows = np.fromiter(
+            ((r["o"], r["h"], r["l"], r["c"], r["t"]) for r in complete),
+            dtype=_POLYGON_ROW_DTYPE,
+            count=len(complete),
+        )
+    except (ValueError, TypeError, OverflowError):
+        return _latest_candles(_parse_polygon_results_slow(complete), limit)
+
+    ts_ms = rows["t"]
+    # None packs as NaN here but must be skipped like float(None)
+    if any(np.isnan(rows[k]).any() for k in ("o", "h", "l", "c")) or (ts_ms % 1000).any():
+        return _latest_candles(_parse_polygon_results_slow(complete), limit)
+
+    if (ts_ms[1:] >= ts_ms[:-1]).all():
+        rows = rows[-limit:]
+    else:
+        rows = rows[np.argsort(ts_ms, kind="stable")[-limit:]]
+
+    stamps = np.datetime_as_string(rows["t"].astype(np.int64).astype("datetime64[ms]"), unit="s")
+    return [
+        {"open": o, "high": h, "low": l, "close": c, "timestamp": ts + "+00:00"}
+        for (o, h, l, c, _), ts in zip(rows.tolist(), stamps.tolist())
+    ]
+
+
+def _parse_polygon_results_slow(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-record conversion of complete Polygon records (skips malformed ones)."""
+    parsed_candles = []
+    for r in results:
+        try:
+            # Convert timestamp (ms) to ISO UTC string
+            ts_ms = r["t"]
+            # Enforce float conversion for prices
+            candle = {
+                "open": float(r["o"]),
+                "high": float(r["h"]),
+                "low": float(r["l"]),
+                "close": float(r["c"]),
+                "timestamp": datetime.datetime.fromtimestamp(
+                    ts_ms / 1000.0, tz=datetime.timezone.utc
+                ).isoformat()
+            }
+            parsed_candles.append(candle)
+        except (ValueError, TypeError) as e:
+            # Skip individual malformed records but keep processing valid ones
+            logger.warning("Skipping malformed candle data: %s - Error: %s", r, e)
+            continue
+    return parsed_candles
+
+
+def _candle_cache_path(ticker: str, limit: int, empty: bool = False) -> str:
+    """Cache file for one (ticker, limit) request (or its empty-result marker)."""
+    suffix = ".empty" if empty else ""
+    return os.path.join(CANDLE_CACHE_DIR, f"{ticker}_{limit}{suffix}.json")
+
+
+def _read_candle_cache(path: str, max_age: float) -> Optional[List[Dict[str, Any]]]:
+    """Return cached candles if the entry exists and is younger than max_age."""
+    try:
+        with open(path, "rb") as f:
+            entry = orjson.loads(f.read())
+        if time.time() - entry["fetched_at"] <= max_age:
+            return entry["candles"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_candle_cache(path: str, candles: List[Dict[str, Any]]) -> None:
+    """
+    Persist candles with their fetch time (atomic replace).
+
+    Each writer gets its own temp file, so concurrent writers (threads or
+    processes) never interleave; the last os.replace wins.
+    """
+    tmp_path = None
+    try:
+        os.makedirs(CANDLE_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=CANDLE_CACHE_DIR, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            f.write(orjson.dumps({"fetched_at": time.time(), "candles": candles}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not write candle cache %s: %s", path, e)
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def cached_fetch_tech_sector_candles(limit: int = 50, ttl: float = CANDLE_CACHE_TTL,
+                                     timeout: float = POLYGON_READ_TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    fetch_tech_sector_candles() behind an on-disk TTL cache.
+
+    Within `ttl` seconds of a successful fetch, the cached candles are
+    returned without calling Polygon. An empty result is remembered for
+    CANDLE_CACHE_EMPTY_TTL seconds in a separate marker file (so the
+    last good entry survives for the stale fallback) and [] is returned
+    without retrying until it expires.
+    """
+    path = _candle_cache_path("XLK", limit)
+    candles = _read_candle_cache(path, ttl)
+    if candles is not None:
+        return candles
+
+    empty_path = _candle_cache_path("XLK", limit, empty=True)
+    if _read_candle_cache(empty_path, CANDLE_CACHE_EMPTY_TTL) is not None:
         return []
 
+    candles = fetch_tech_sector_candles(limit=limit, timeout=timeout)
+    _write_candle_cache(path if candles else empty_path, candles)
+    return candles
+
+
+def load_stale_tech_sector_candles(limit: int = 50, max_age: float = CANDLE_CACHE_STALE_TTL) -> List[Dict[str, Any]]:
+    """
+    Last successfully fetched candles, up to `max_age` seconds old.
+
+    Fallback for when Polygon errors or returns nothing, so callers can
+    keep showing real (if stale) data instead of dropping to mock data.
+    Returns [] if no usable cache entry exists.
+    """
+    return _read_candle_cache(_candle_cache_path("XLK", limit), max_age) or []
+
 
 # =============================================================================
 # VALIDATION (Phase 1 Only - Market Data Ingestion)
@@ -153,6 +461,8 @@ def fetch_tech_sector_candles(limit: int = 50) -> List[Dict[str, Any]]:
 if __name__ == "__main__":
     import json
     
+    configure_logging()
+    
     print("=" * 60)
     print("OPPORTUNITY SCANNER - Phase 1 Validation")
     print("=" * 60)
@@ -17,8 +17,27 @@ Safety Philosophy:
 Author: Quantitative Portfolio Engineering Team
 """
 
+from collections import defaultdict
 from typing import List, Dict, Any
 
+# Rule categories per action type, packed as bit flags so each decision
+# costs one dict lookup (unknown / non-allocating actions map to 0)
+_INCREASING = 1          # Rule 1 when concentrated
+_AGGRESSIVE_ALLOC = 2    # Rule 1 when approaching concentration
+_CAPITAL_REQUIRING = 4   # Rule 2
+_AGGRESSIVE_VOL = 8      # Rule 3
+
+_ACTION_FLAGS = {
+    "ALLOCATE": _INCREASING | _CAPITAL_REQUIRING,
+    "ALLOCATE_HIGH": _INCREASING | _AGGRESSIVE_ALLOC | _CAPITAL_REQUIRING,
+    "ALLOCATE_AGGRESSIVE": _INCREASING | _AGGRESSIVE_ALLOC | _CAPITAL_REQUIRING | _AGGRESSIVE_VOL,
+    "SCALE_UP": _INCREASING | _AGGRESSIVE_ALLOC | _CAPITAL_REQUIRING | _AGGRESSIVE_VOL,
+    "DOUBLE_DOWN": _INCREASING | _CAPITAL_REQUIRING | _AGGRESSIVE_VOL,
+    "ADD_POSITION": _INCREASING | _CAPITAL_REQUIRING,
+    "ALLOCATE_CAPPED": _CAPITAL_REQUIRING,
+    "ALLOCATE_CAUTIOUS": _CAPITAL_REQUIRING,
+}
+
 
 def apply_risk_guardrails(
     proposed_decisions: List[Dict[str, Any]],
@@ -88,62 +107,57 @@ def apply_risk_guardrails(
     # =========================================================================
     # APPLY SAFETY RULES
     # =========================================================================
-    allowed = []
-    blocked = []
+    # Classify first (one reason or None per decision), build results after
+    block_reasons = []
+    
+    volatility_expanding = volatility_state == "EXPANDING"
+    cash_short = cash_available < minimum_reserve
+    approaching = severity == "APPROACHING"
     
     for decision in proposed_decisions:
-        action_type = decision.get("action", "UNKNOWN")
-        sector = decision.get("sector", "UNKNOWN")
+        flags = _ACTION_FLAGS.get(decision.get("action", "UNKNOWN"), 0)
         
         block_reason = None
         
+        # When several rules fire, the reported reason is the highest-numbered
+        # one, so rules are checked from 3 down to 1 and stop at the first hit.
+        
         # ---------------------------------------------------------------------
-        # RULE 1: Sector Concentration Guard
+        # RULE 3: Volatility × Aggression Guard
         # ---------------------------------------------------------------------
-        if is_concentrated and sector == dominant_sector:
-            increasing_actions = {
-                "ALLOCATE", "ALLOCATE_HIGH", "ALLOCATE_AGGRESSIVE",
-                "SCALE_UP", "DOUBLE_DOWN", "ADD_POSITION"
-            }
-            if action_type in increasing_actions:
-                block_reason = "Sector concentration breach"
-        
-        if severity == "APPROACHING" and sector == dominant_sector:
-            aggressive_allocs = {"ALLOCATE_HIGH", "ALLOCATE_AGGRESSIVE", "SCALE_UP"}
-            if action_type in aggressive_allocs:
-                block_reason = "Sector concentration breach"
+        if volatility_expanding and flags & _AGGRESSIVE_VOL:
+            block_reason = "Aggressive action blocked during expanding volatility"
         
         # ---------------------------------------------------------------------
         # RULE 2: Cash Reserve Guard
         # ---------------------------------------------------------------------
-        if cash_available < minimum_reserve:
-            capital_actions = {
-                "ALLOCATE", "ALLOCATE_HIGH", "ALLOCATE_AGGRESSIVE",
-                "ALLOCATE_CAPPED", "ALLOCATE_CAUTIOUS",
-                "SCALE_UP", "ADD_POSITION", "DOUBLE_DOWN"
-            }
-            if action_type in capital_actions:
-                block_reason = "Insufficient cash reserve"
+        elif cash_short and flags & _CAPITAL_REQUIRING:
+            block_reason = "Insufficient cash reserve"
         
         # ---------------------------------------------------------------------
-        # RULE 3: Volatility × Aggression Guard
+        # RULE 1: Sector Concentration Guard
+        # (any increasing action when concentrated, aggressive ones when approaching)
         # ---------------------------------------------------------------------
-        if volatility_state == "EXPANDING":
-            aggressive_actions = {"ALLOCATE_AGGRESSIVE", "SCALE_UP", "DOUBLE_DOWN"}
-            if action_type in aggressive_actions:
-                block_reason = "Aggressive action blocked during expanding volatility"
+        elif decision.get("sector", "UNKNOWN") == dominant_sector and (
+            (is_concentrated and flags & _INCREASING)
+            or (approaching and flags & _AGGRESSIVE_ALLOC)
+        ):
+            block_reason = "Sector concentration breach"
         
-        # ---------------------------------------------------------------------
-        # DECISION: ALLOW or BLOCK
-        # ---------------------------------------------------------------------
-        if block_reason:
-            blocked_decision = decision.copy()
-            blocked_decision["safety_reason"] = block_reason
-            blocked.append(blocked_decision)
-            # UPGRADE 3: Log blocked action
-            thought_log.append(f"🚫 BLOCKED: {decision.get('target', 'N/A')} — {block_reason}")
-        else:
-            allowed.append(decision)
+        block_reasons.append(block_reason)
+    
+    # -------------------------------------------------------------------------
+    # DECISION: ALLOW or BLOCK
+    # -------------------------------------------------------------------------
+    allowed = [d for d, reason in zip(proposed_decisions, block_reasons) if reason is None]
+    blocked = [
+        {**d, "safety_reason": reason}
+        for d, reason in zip(proposed_decisions, block_reasons) if reason is not None
+    ]
+    # UPGRADE 3: Log blocked actions
+    thought_log.extend(
+        f"🚫 BLOCKED: {d.get('target', 'N/A')} — {d['safety_reason']}" for d in blocked
+    )
     
     return {
         "allowed_actions": allowed,
@@ -169,14 +183,12 @@ def summarize_guardrail_results(results: Dict[str, Any]) -> str:
     
     # Group by reason
     blocked = results.get("blocked_actions", [])
-    reasons = {}
+    reasons = defaultdict(list)
     for b in blocked:
-        reason = b.get("safety_reason", "Unknown")
-        reasons.setdefault(reason, []).append(b.get("target", "N/A"))
+        reasons[b.get("safety_reason", "Unknown")].append(b.get("target", "N/A"))
     
     parts = [f"Safety: {allowed_count} allowed, {blocked_count} blocked."]
-    for reason, symbols in reasons.items():
-        parts.append(f"  - {reason}: {', '.join(symbols)}")
+    parts += [f"  - {reason}: {', '.join(symbols)}" for reason, symbols in reasons.items()]
     
     return " ".join(parts)
 
@@ -0,0 +1,78 @@
+"""
+tests/test_alpaca_batch.py
+
+Unit test for AlpacaAdapter.get_recent_candles_batch.
+Uses MOCKED multi-symbol bar pages (no network).
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broker.alpaca_adapter import AlpacaAdapter
+
+
+def make_bars(count, start=0):
+    """Minute bars, oldest first; close encodes the bar index."""
+    return [
+        {"t": f"2024-01-02T14:{(start + i) % 60:02d}:00Z", "o": 1, "h": 2, "l": 0.5,
+         "c": float(start + i), "v": 100}
+        for i in range(count)
+    ]
+
+
+@patch.dict(os.environ, {"ALPACA_API_KEY": "test", "ALPACA_SECRET_KEY": "test"})
+class TestAlpacaBatchCandles(unittest.TestCase):
+    def test_follows_pages_across_symbols(self):
+        # The page limit counts bars across symbols: AAPL's oldest bars
+        # fill page 1, the rest of AAPL and all of MSFT arrive on page 2.
+        pages = [
+            {"bars": {"AAPL": make_bars(60)}, "next_page_token": "p2"},
+            {"bars": {"AAPL": make_bars(30, start=60), "MSFT": make_bars(70)},
+             "next_page_token": None},
+        ]
+        adapter = AlpacaAdapter()
+        with patch.object(adapter, "_request", side_effect=pages) as mock_request, \
+             patch.object(adapter, "get_recent_candles") as mock_single:
+            result = adapter.get_recent_candles_batch(["AAPL", "MSFT"], limit=50, timeframe="1Min")
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertIn("page_token=p2", mock_request.call_args_list[1].args[0])
+        mock_single.assert_not_called()
+
+        # Most recent 50 bars per symbol
+        self.assertEqual([c["close"] for c in result["AAPL"]], [float(i) for i in range(40, 90)])
+        self.assertEqual([c["close"] for c in result["MSFT"]], [float(i) for i in range(20, 70)])
+
+    def test_short_symbol_falls_back_to_single_symbol_path(self):
+        pages = [{"bars": {"AAPL": make_bars(50), "MSFT": make_bars(3)}}]
+        fallback = make_bars(50)
+        adapter = AlpacaAdapter()
+        with patch.object(adapter, "_request", side_effect=pages), \
+             patch.object(adapter, "get_recent_candles", return_value=fallback) as mock_single:
+            result = adapter.get_recent_candles_batch(["AAPL", "MSFT", "NVDA"], limit=50, timeframe="1Min")
+
+        # MSFT came back short and NVDA not at all
+        self.assertEqual(
+            [call.args[0] for call in mock_single.call_args_list], ["MSFT", "NVDA"]
+        )
+        self.assertEqual(len(result["AAPL"]), 50)
+        self.assertIs(result["MSFT"], fallback)
+        self.assertIs(result["NVDA"], fallback)
+
+    def test_failed_batch_request_fetches_per_symbol(self):
+        adapter = AlpacaAdapter()
+        with patch.object(adapter, "_request", side_effect=RuntimeError("Alpaca API error")), \
+             patch.object(adapter, "get_recent_candles", return_value=[]) as mock_single:
+            result = adapter.get_recent_candles_batch(["AAPL", "MSFT"], limit=50, timeframe="1Min")
+
+        self.assertEqual(result, {"AAPL": [], "MSFT": []})
+        self.assertEqual(mock_single.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+tests/test_analysis_cache.py
+
+Unit tests for the market_aware_runner result cache.
+Market status is MOCKED as CLOSED so runs use the historical cache files.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root AND backend to path to fix imports
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+sys.path.insert(0, os.path.join(root_dir, "backend"))
+
+from backend.app import app
+import market_aware_runner
+from market_aware_runner import run_market_aware_analysis, clear_analysis_cache
+
+CLOSED_STATUS = {"is_open": False, "label": "CLOSED", "timestamp": "2023-01-01T00:00:00"}
+CACHE_HIT_NOTE = "♻️ Inputs unchanged — reused the previous analysis"
+
+
+@patch("data_router.get_market_status", return_value=CLOSED_STATUS)
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+        self.app.post("/reset")
+
+    def tearDown(self):
+        clear_analysis_cache()
+
+    def test_repeat_run_is_served_from_cache(self, _status):
+        first = run_market_aware_analysis(verbose=False)
+        with patch("data_router.DataRouter.get_market_data") as mock_fetch:
+            second = run_market_aware_analysis(verbose=False)
+
+        mock_fetch.assert_not_called()
+        self.assertEqual(second["analysis"], first["analysis"])
+        self.assertEqual(second["thought_log"][-1], CACHE_HIT_NOTE)
+        self.assertNotIn(CACHE_HIT_NOTE, first["thought_log"])
+
+        # Hits are private copies
+        second["analysis"]["mutated"] = True
+        self.assertNotIn("mutated", run_market_aware_analysis(verbose=False)["analysis"])
+
+    def test_scenario_and_crash_runs_bypass_cache(self, _status):
+        run_market_aware_analysis(scenario_id="crash_reflex", verbose=False)
+        run_market_aware_analysis(
+            crash_override={"force_volatility_state": "EXPANDING"}, verbose=False
+        )
+        self.assertEqual(len(market_aware_runner._result_cache), 0)
+
+    def test_candle_file_change_invalidates(self, _status):
+        run_market_aware_analysis(verbose=False)
+        with patch("market_aware_runner.get_file_mtime", return_value=-1.0):
+            result = run_market_aware_analysis(verbose=False)
+
+        self.assertNotIn(CACHE_HIT_NOTE, result["thought_log"])
+        self.assertEqual(len(market_aware_runner._result_cache), 2)
+
+    def test_failed_fetch_is_not_cached(self, _status):
+        failed = {"status": "error", "error": "boom", "candles": [], "metadata": None}
+        with patch("data_router.DataRouter.get_market_data", return_value=failed):
+            run_market_aware_analysis(verbose=False)
+        self.assertEqual(len(market_aware_runner._result_cache), 0)
+
+    def test_reset_clears_cache(self, _status):
+        run_market_aware_analysis(verbose=False)
+        self.assertEqual(len(market_aware_runner._result_cache), 1)
+
+        self.app.post("/reset")
+
+        self.assertEqual(len(market_aware_runner._result_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
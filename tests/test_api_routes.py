@@ -0,0 +1,144 @@
+"""
+tests/test_api_routes.py
+
+Unit tests for backend/api_routes.py request handling.
+The analysis engine is MOCKED so no market data is loaded.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import tempfile
+
+# Add project root AND backend to path to fix imports
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+sys.path.insert(0, os.path.join(root_dir, "backend"))
+
+from backend.app import app
+import api_routes
+
+CLOSED_STATUS = {"is_open": False, "label": "CLOSED", "timestamp": "2023-01-01T00:00:00"}
+
+
+class TestRunEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    @patch("api_routes.save_agent_memory")
+    @patch("api_routes.run_market_aware_analysis")
+    def test_unserializable_result_returns_json_error(self, mock_run, mock_save):
+        # orjson can't encode a bare object(); the failure must reach _fail()
+        mock_run.return_value = {"analysis": {}, "bad": object()}
+
+        resp = self.app.get("/run")
+
+        self.assertEqual(resp.status_code, 500)
+        data = resp.get_json()
+        self.assertEqual(data["status"], "FAILED")
+        self.assertIn("not JSON serializable", data["error"])
+
+    @patch("api_routes.save_agent_memory")
+    @patch("api_routes.run_market_aware_analysis")
+    def test_head_reads_query_string(self, mock_run, mock_save):
+        mock_run.return_value = {"analysis": {}}
+
+        resp = self.app.head("/run?symbol=QQQ&time_range=1M")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_run.call_args.kwargs["symbol"], "QQQ")
+        self.assertEqual(mock_run.call_args.kwargs["time_range"], "1M")
+
+
+class TestAgentMemory(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.memory_file = os.path.join(tmp_dir.name, "agent_memory.json")
+
+    @patch("api_routes.run_market_aware_analysis")
+    def test_run_persists_last_run(self, mock_run):
+        mock_run.return_value = {
+            "analysis": {"market_posture": {"market_posture": "TEST_POSTURE", "risk_level": "HIGH"}}
+        }
+        with patch("api_routes.MEMORY_FILE", self.memory_file), \
+             patch("api_routes._MEMORY_CACHE", {"last_run": None}), \
+             patch("api_routes._HEALTH_JSON", b""):
+            resp = self.app.get("/run")
+
+        self.assertEqual(resp.status_code, 200)
+        # Written before /run returned: nothing is left pending at shutdown
+        with open(self.memory_file) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["last_run"]["market_posture"], "TEST_POSTURE")
+        self.assertEqual(saved["last_run"]["risk_level"], "HIGH")
+
+    def test_file_is_read_once_and_copies_returned(self):
+        with open(self.memory_file, "w") as f:
+            json.dump({"last_run": {"market_posture": "NEUTRAL"}}, f)
+
+        with patch("api_routes.MEMORY_FILE", self.memory_file), \
+             patch("api_routes._MEMORY_CACHE", None):
+            first = api_routes.load_agent_memory()
+            os.remove(self.memory_file)
+            second = api_routes.load_agent_memory()
+            second["last_run"] = None
+            third = api_routes.load_agent_memory()
+
+        self.assertEqual(first["last_run"]["market_posture"], "NEUTRAL")
+        self.assertEqual(third, first)
+
+    def test_unchanged_last_run_is_not_rewritten(self):
+        memory = {"last_run": {"market_posture": "NEUTRAL", "risk_level": "LOW"}}
+        with patch("api_routes.MEMORY_FILE", self.memory_file), \
+             patch("api_routes._MEMORY_CACHE", {"last_run": None}), \
+             patch("api_routes._HEALTH_JSON", b""):
+            api_routes.save_agent_memory(memory)
+            os.remove(self.memory_file)
+            api_routes.save_agent_memory(dict(memory))
+            self.assertFalse(os.path.exists(self.memory_file))
+
+            # /health is rebuilt from the saved memory
+            health = self.app.get("/health").get_json()
+
+        self.assertTrue(health["agent"]["has_previous_run"])
+        self.assertEqual(health["agent"]["last_posture"], "NEUTRAL")
+        self.assertEqual(health["agent"]["last_risk"], "LOW")
+        self.assertNotIn("__HEALTH_TIMESTAMP__", health["timestamp"])
+
+
+@patch("data_router.get_market_status", return_value=CLOSED_STATUS)
+class TestStatusCache(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+        self.app.post("/reset")
+
+    def tearDown(self):
+        self.app.post("/reset")
+
+    def test_set_symbol_and_time_range_invalidate(self, _status):
+        self.assertEqual(self.app.get("/status").get_json()["selected_symbol"], "SPY")
+
+        self.app.post("/set-symbol", json={"symbol": "QQQ"})
+        self.assertEqual(self.app.get("/status").get_json()["selected_symbol"], "QQQ")
+
+        self.app.post("/set-time-range", json={"time_range": "1M"})
+        self.assertEqual(self.app.get("/status").get_json()["selected_time_range"], "1M")
+
+    def test_reset_invalidates(self, _status):
+        self.app.post("/set-symbol", json={"symbol": "QQQ"})
+        self.assertEqual(self.app.get("/status").get_json()["selected_symbol"], "QQQ")
+
+        self.app.post("/reset")
+
+        self.assertEqual(self.app.get("/status").get_json()["selected_symbol"], "SPY")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+tests/test_demo_context.py
+
+Verifies full_system_demo keeps one market status snapshot per process:
+a later status change must not mix OPEN status with HISTORICAL data.
+Also checks the demo's per-phase stdout buffering.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+from contextlib import redirect_stdout
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import full_system_demo
+import market_mode
+
+OPEN_STATUS = {"status": "OPEN", "reason": "Regular session", "timestamp": "2023-06-15T10:00:00"}
+
+
+class TestDemoContextSnapshot(unittest.TestCase):
+    def test_status_and_data_mode_come_from_one_snapshot(self):
+        expected = full_system_demo.MARKET_STATUS
+        context = full_system_demo.EXECUTION_CONTEXT
+        self.assertEqual(context["market_status"], expected["status"])
+
+        # The market "opens" after import: results must not change mode
+        with patch.object(market_mode, "get_market_status", return_value=OPEN_STATUS):
+            result = full_system_demo.run_demo_scenario(symbol="QQQ")
+
+        self.assertEqual(result["market_status"], expected)
+        self.assertEqual(result["data_mode"], context["data_feed_mode"])
+        self.assertEqual(result["portfolio_source"], context["data_capability"])
+
+
+
+class TestPhaseOutput(unittest.TestCase):
+    def test_one_write_per_phase(self):
+        target = MagicMock()
+        out = full_system_demo._PhaseOutput(target)
+
+        with redirect_stdout(out):
+            print("=== PHASE 2 ===")
+            print("[Signal] Volatility State: STABLE")
+            out.end_phase()
+            out.end_phase()  # nothing printed since: no write
+            print("=== PHASE 3 ===")
+            out.end_phase()
+
+        self.assertEqual(
+            [call.args[0] for call in target.write.call_args_list],
+            ["=== PHASE 2 ===\n[Signal] Volatility State: STABLE\n", "=== PHASE 3 ===\n"],
+        )
+        self.assertEqual(target.flush.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+tests/test_historical_data_service.py
+
+Unit tests for historical_data_service.py using a temporary cache directory.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import tempfile
+
+import orjson
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import historical_data_service
+from historical_data_service import HistoricalDataService
+
+
+def write_cache_file(cache_dir, filename, candles):
+    with open(os.path.join(cache_dir, filename), "w") as f:
+        json.dump(candles, f)
+
+
+class TestCacheScan(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = tmp_dir.name
+        patcher = patch.object(historical_data_service, "CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_symbol_names_in_file_names(self):
+        for filename in (
+            "SPY_2023-01-01_2023-06-01.json",
+            "BRK-B_2023-01-01_2023-06-01.json",
+            "BRK.A_2023-01-01_2023-06-01.json",
+            "spy2_2023-01-01_2023-06-01.json",
+            # Not cache files
+            "notes.json",
+            "SPY_2023-01-01.json",
+            "SPY_2023-01-01_2023-06-01.json.tmp",
+        ):
+            write_cache_file(self.cache_dir, filename, [])
+
+        service = HistoricalDataService()
+
+        self.assertEqual(service.get_available_symbols(), ("BRK-B", "BRK.A", "SPY", "spy2"))
+        self.assertEqual(service.get_symbol_metadata("BRK-B")["start_date"], "2023-01-01")
+
+    def test_all_metadata_is_json_serializable(self):
+        write_cache_file(self.cache_dir, "SPY_2023-01-01_2023-06-01.json", [
+            {"timestamp": "2023-01-03T05:00:00Z", "open": 1, "high": 2, "low": 0.5, "close": 1.5}
+        ])
+        service = HistoricalDataService()
+
+        metadata = service.get_all_metadata()
+
+        # Same encoder as the API's JSON provider
+        decoded = orjson.loads(orjson.dumps(metadata))
+        self.assertEqual(decoded["SPY"]["candle_count"], 1)
+        # A copy: callers can't change the service's own metadata
+        metadata.pop("SPY")
+        self.assertIn("SPY", service.get_all_metadata())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,9 @@ Verifies API behavior when market is closed.
 """
 
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import sys
 import os
-import json
 
 # Add project root AND backend to path to fix imports
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
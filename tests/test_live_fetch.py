@@ -0,0 +1,79 @@
+"""
+tests/test_live_fetch.py
+
+Verifies the threaded live fetch in market_aware_runner gives the same
+analysis as fetching one call at a time.
+Market status and the Alpaca adapter are MOCKED (no network).
+"""
+
+import unittest
+from unittest.mock import patch
+from concurrent.futures import Executor, Future
+import sys
+import os
+
+# Add project root AND backend to path to fix imports
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+sys.path.insert(0, os.path.join(root_dir, "backend"))
+
+from backend.app import app
+from market_aware_runner import run_market_aware_analysis, clear_analysis_cache
+
+OPEN_STATUS = {"is_open": True, "label": "OPEN", "timestamp": "2023-06-15T10:00:00"}
+
+
+class SequentialExecutor(Executor):
+    """Runs each submitted call immediately, in the calling thread."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def make_candles(count):
+    return [
+        {"timestamp": f"2023-06-15T09:{i:02d}:00", "open": 150 + i, "high": 152 + i,
+         "low": 149 + i, "close": 151 + i, "volume": 1000}
+        for i in range(count)
+    ]
+
+
+@patch("data_router.get_market_status", return_value=OPEN_STATUS)
+@patch("broker.alpaca_adapter.AlpacaAdapter")
+class TestLiveFetch(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def tearDown(self):
+        clear_analysis_cache()
+        self.app.post("/reset")
+
+    def test_threaded_fetch_matches_sequential(self, mock_adapter_cls, _status):
+        adapter = mock_adapter_cls.return_value
+        adapter.get_portfolio.return_value = {"total_capital": 100000, "cash": 50000}
+        adapter.get_positions.return_value = [
+            {"symbol": "AAPL", "qty": 10, "market_value": 1500, "current_price": 150}
+        ]
+        adapter.get_recent_candles.return_value = make_candles(30)
+        adapter.get_headlines.return_value = ["Tech stocks rally"]
+        adapter.get_sector_heatmap.return_value = {"TECH": 75, "FINANCE": 60}
+        adapter.get_candidates.return_value = [
+            {"symbol": "MSFT", "sector": "TECH", "projected_efficiency": 70}
+        ]
+        self.app.post("/reset")
+
+        threaded = run_market_aware_analysis(verbose=False)
+        clear_analysis_cache()
+        with patch("market_aware_runner._live_fetch_pool", SequentialExecutor()):
+            sequential = run_market_aware_analysis(verbose=False)
+
+        self.assertEqual(threaded["data_mode"], "LIVE")
+        self.assertEqual(threaded["analysis"], sequential["analysis"])
+        self.assertEqual(threaded["thought_log"], sequential["thought_log"])
+
+
+if __name__ == "__main__":
+    unittest.main()
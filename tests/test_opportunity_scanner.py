@@ -0,0 +1,110 @@
+"""
+tests/test_opportunity_scanner.py
+
+Unit tests for Polygon aggregate parsing and the on-disk candle cache
+in opportunity_scanner.py. The packed NumPy parser must match the
+per-record parser (no network).
+"""
+
+import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+import random
+import tempfile
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import opportunity_scanner
+from opportunity_scanner import (
+    _candle_cache_path,
+    _read_candle_cache,
+    _write_candle_cache,
+    _parse_polygon_results,
+    _parse_polygon_results_slow,
+    _latest_candles,
+)
+
+DAY_MS = 86_400_000
+START_MS = 1_672_531_200_000  # 2023-01-01T00:00:00Z
+
+
+def make_results(rng, count, shuffle=False):
+    """Polygon aggregate records with distinct whole-second timestamps."""
+    stamps = [START_MS + i * DAY_MS + rng.randrange(0, 3600) * 1000 for i in range(count)]
+    if shuffle:
+        rng.shuffle(stamps)
+    results = []
+    for t in stamps:
+        low = round(rng.uniform(50, 500), 2)
+        results.append({
+            "o": round(low + rng.uniform(0, 5), 2),
+            "h": round(low + rng.uniform(5, 10), 2),
+            "l": low,
+            # Integer prices come back from Polygon for some tickers
+            "c": int(low) if rng.random() < 0.2 else round(low + rng.uniform(0, 5), 2),
+            "t": t,
+            "v": rng.randrange(1000, 100000),
+        })
+    return results
+
+
+def parse_slow(results, limit):
+    return _latest_candles(_parse_polygon_results_slow(results), limit)
+
+
+class TestParsePolygonResults(unittest.TestCase):
+    def test_matches_per_record_parser(self):
+        rng = random.Random(7)
+        for shuffle in (False, True):
+            for count, limit in ((1, 50), (30, 50), (120, 50), (200, 1)):
+                results = make_results(rng, count, shuffle=shuffle)
+                with self.subTest(shuffle=shuffle, count=count, limit=limit):
+                    self.assertEqual(
+                        _parse_polygon_results(results, limit), parse_slow(results, limit)
+                    )
+
+    def test_malformed_records_match_per_record_parser(self):
+        rng = random.Random(11)
+        results = make_results(rng, 40)
+        results[3]["c"] = None                  # skipped record
+        results[5]["h"] = "n/a"                 # skipped record
+        del results[8]["o"]                     # incomplete record
+        results[12]["t"] += 500                 # sub-second timestamp
+        results[20]["t"] = float(results[20]["t"])
+
+        self.assertEqual(_parse_polygon_results(results, 25), parse_slow(
+            [r for r in results if "o" in r], 25
+        ))
+
+    def test_empty_and_incomplete_input(self):
+        self.assertEqual(_parse_polygon_results([], 10), [])
+        self.assertEqual(_parse_polygon_results([{"o": 1, "h": 2}], 10), [])
+
+
+
+class TestCandleCache(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = tmp_dir.name
+        patcher = patch.object(opportunity_scanner, "CANDLE_CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_writers_leave_one_complete_entry(self):
+        rng = random.Random(13)
+        path = _candle_cache_path("XLK", 50)
+        batches = [parse_slow(make_results(rng, 200), 200) for _ in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda candles: _write_candle_cache(path, candles), batches * 4))
+
+        self.assertIn(_read_candle_cache(path, max_age=60), batches)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(path)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+tests/test_risk_guardrails.py
+
+Unit tests for risk_guardrails.apply_risk_guardrails rule precedence.
+The _ACTION_FLAGS table must block exactly what the per-rule action sets
+did, and report the same reason when several rules fire.
+"""
+
+import unittest
+import itertools
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_guardrails import apply_risk_guardrails, _ACTION_FLAGS
+
+# Rule action sets, as originally written out per rule
+INCREASING_ACTIONS = {
+    "ALLOCATE", "ALLOCATE_HIGH", "ALLOCATE_AGGRESSIVE",
+    "SCALE_UP", "DOUBLE_DOWN", "ADD_POSITION"
+}
+AGGRESSIVE_ALLOCS = {"ALLOCATE_HIGH", "ALLOCATE_AGGRESSIVE", "SCALE_UP"}
+CAPITAL_ACTIONS = {
+    "ALLOCATE", "ALLOCATE_HIGH", "ALLOCATE_AGGRESSIVE",
+    "ALLOCATE_CAPPED", "ALLOCATE_CAUTIOUS",
+    "SCALE_UP", "ADD_POSITION", "DOUBLE_DOWN"
+}
+AGGRESSIVE_ACTIONS = {"ALLOCATE_AGGRESSIVE", "SCALE_UP", "DOUBLE_DOWN"}
+
+CONCENTRATION = "Sector concentration breach"
+CASH = "Insufficient cash reserve"
+VOLATILITY = "Aggressive action blocked during expanding volatility"
+
+
+def expected_reason(action, sector, is_concentrated, severity, cash_short, volatility_state):
+    """Rules applied 1 -> 3, each later hit overwriting the reason."""
+    reason = None
+    if is_concentrated and sector == "TECH" and action in INCREASING_ACTIONS:
+        reason = CONCENTRATION
+    if severity == "APPROACHING" and sector == "TECH" and action in AGGRESSIVE_ALLOCS:
+        reason = CONCENTRATION
+    if cash_short and action in CAPITAL_ACTIONS:
+        reason = CASH
+    if volatility_state == "EXPANDING" and action in AGGRESSIVE_ACTIONS:
+        reason = VOLATILITY
+    return reason
+
+
+class TestGuardrailPrecedence(unittest.TestCase):
+    def test_matches_per_rule_sets(self):
+        actions = sorted(_ACTION_FLAGS) + ["HOLD", "REDUCE", "UNKNOWN"]
+        decisions = [
+            {"action": action, "sector": sector, "target": f"{action}-{sector}"}
+            for action in actions for sector in ("TECH", "ENERGY")
+        ]
+        for is_concentrated, severity, cash_short, volatility_state in itertools.product(
+            (False, True), ("NONE", "APPROACHING"), (False, True), ("STABLE", "EXPANDING")
+        ):
+            risk_context = {
+                "concentration": {
+                    "is_concentrated": is_concentrated,
+                    "dominant_sector": "TECH",
+                    "severity": severity,
+                },
+                "cash_available": 10000.0 if cash_short else 90000.0,
+                "minimum_reserve": 50000.0,
+                "volatility_state": volatility_state,
+            }
+            result = apply_risk_guardrails(decisions, risk_context)
+            reasons = {d["target"]: d["safety_reason"] for d in result["blocked_actions"]}
+
+            for d in decisions:
+                with self.subTest(target=d["target"], concentrated=is_concentrated,
+                                  severity=severity, cash_short=cash_short,
+                                  volatility=volatility_state):
+                    self.assertEqual(
+                        reasons.get(d["target"]),
+                        expected_reason(d["action"], d["sector"], is_concentrated,
+                                        severity, cash_short, volatility_state)
+                    )
+            self.assertEqual(
+                len(result["allowed_actions"]) + len(result["blocked_actions"]), len(decisions)
+            )
+
+    def test_highest_numbered_rule_is_reported(self):
+        risk_context = {
+            "concentration": {"is_concentrated": True, "dominant_sector": "TECH"},
+            "cash_available": 0.0,
+            "minimum_reserve": 50000.0,
+            "volatility_state": "EXPANDING",
+        }
+        thought_log = []
+        result = apply_risk_guardrails(
+            [{"action": "SCALE_UP", "sector": "TECH", "target": "NVDA"},
+             {"action": "ALLOCATE", "sector": "TECH", "target": "AAPL"}],
+            risk_context,
+            thought_log,
+        )
+
+        self.assertEqual(
+            [d["safety_reason"] for d in result["blocked_actions"]], [VOLATILITY, CASH]
+        )
+        self.assertEqual(thought_log, [
+            f"🚫 BLOCKED: NVDA — {VOLATILITY}",
+            f"🚫 BLOCKED: AAPL — {CASH}",
+        ])
+
+    def test_missing_risk_context_blocks_all(self):
+        result = apply_risk_guardrails([{"action": "HOLD", "target": "SPY"}], {})
+        self.assertEqual(result["allowed_actions"], [])
+        self.assertEqual(
+            result["blocked_actions"][0]["safety_reason"],
+            "Safety check failed: missing risk context"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
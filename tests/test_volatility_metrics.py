@@ -0,0 +1,70 @@
+"""
+tests/test_volatility_metrics.py
+
+Unit tests for volatility_metrics.compute_atr.
+The NumPy path (long series) must match the per-candle loop.
+"""
+
+import unittest
+from unittest.mock import patch
+import random
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import volatility_metrics
+from volatility_metrics import compute_atr, NUMPY_MIN_CANDLES
+
+
+def make_candles(rng, count):
+    candles = []
+    close = 100.0
+    for i in range(count):
+        low = close - rng.uniform(0, 3)
+        high = close + rng.uniform(0, 3)
+        close = rng.uniform(low, high)
+        candles.append({
+            "timestamp": f"2023-01-01T{i // 60:02d}:{i % 60:02d}:00",
+            "open": close,
+            "high": round(high, 2),
+            "low": round(low, 2),
+            "close": round(close, 2),
+        })
+    rng.shuffle(candles)
+    return candles
+
+
+def loop_atr(candles, period):
+    """compute_atr with the NumPy path disabled."""
+    with patch.object(volatility_metrics, "NUMPY_MIN_CANDLES", float("inf")):
+        return compute_atr(candles, period)
+
+
+class TestComputeAtr(unittest.TestCase):
+    def test_numpy_path_matches_loop(self):
+        rng = random.Random(3)
+        for count in (NUMPY_MIN_CANDLES, 100, 500):
+            for period in (5, 14, 50):
+                candles = make_candles(rng, count)
+                with self.subTest(count=count, period=period):
+                    fast = compute_atr(candles, period)["atr"]
+                    self.assertIsNotNone(fast)
+                    self.assertAlmostEqual(fast, loop_atr(candles, period)["atr"], places=3)
+
+    def test_malformed_candle_falls_back_to_loop(self):
+        rng = random.Random(5)
+        candles = sorted(make_candles(rng, 100), key=lambda c: c["timestamp"])
+        candles[-3]["high"] = "n/a"
+
+        self.assertEqual(compute_atr(candles, 14), loop_atr(candles, 14))
+
+    def test_insufficient_data(self):
+        rng = random.Random(9)
+        self.assertEqual(compute_atr(make_candles(rng, 10), 14), {"atr": None})
+        self.assertEqual(compute_atr([], 14), {"atr": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,29 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+# Below this many candles the per-candle Python loop is cheaper than
+# building NumPy arrays
+NUMPY_MIN_CANDLES = 64
+
+
+def _candles_to_hlc(candles: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extract high/low/close into float64 arrays in a single pass.
+
+    Raises ValueError/TypeError on a malformed candle so the caller can
+    fall back to the per-candle loop (which skips bad records).
+    """
+    n = len(candles)
+    high = np.empty(n, dtype=np.float64)
+    low = np.empty(n, dtype=np.float64)
+    close = np.empty(n, dtype=np.float64)
+    for i, c in enumerate(candles):
+        high[i] = float(c.get("high", 0))
+        low[i] = float(c.get("low", 0))
+        close[i] = float(c.get("close", 0))
+    return high, low, close
+
 
 def compute_atr(candles: List[Dict], period: int = 14) -> Dict[str, Optional[float]]:
     """
@@ -33,22 +58,42 @@ def compute_atr(candles: List[Dict], period: int = 14) -> Dict[str, Optional[flo
         return {"atr": None}
 
     # 3. Compute True Range (TR) Series
+    # Vectorized path for larger series. Only the last period+1 candles
+    # feed the SMA, so only those are converted. Malformed candles fall
+    # through to the loop below, which skips them individually.
+    if len(sorted_candles) >= NUMPY_MIN_CANDLES:
+        try:
+            high, low, close = _candles_to_hlc(sorted_candles[-(period + 1):])
+        except (ValueError, TypeError):
+            pass
+        else:
+            prev_c = close[:-1]
+            tr = np.maximum(
+                high[1:] - low[1:],
+                np.maximum(np.abs(high[1:] - prev_c), np.abs(low[1:] - prev_c))
+            )
+            atr_value = float(tr[-period:].sum()) / period
+            return {"atr": round(atr_value, 4)}
+
+    # Builtins bound to locals for the per-candle loop
+    _float, _abs, _max = float, abs, max
     tr_values = []
+    tr_append = tr_values.append
     for i in range(1, len(sorted_candles)):
         current = sorted_candles[i]
         prev = sorted_candles[i-1]
         try:
-            current_h = float(current.get("high", 0))
-            current_l = float(current.get("low", 0))
-            current_c = float(current.get("close", 0))
-            prev_c = float(prev.get("close", 0))
+            current_h = _float(current.get("high", 0))
+            current_l = _float(current.get("low", 0))
+            current_c = _float(current.get("close", 0))
+            prev_c = _float(prev.get("close", 0))
             
-            tr = max(
+            tr = _max(
                 current_h - current_l,
-                abs(current_h - prev_c),
-                abs(current_l - prev_c)
+                _abs(current_h - prev_c),
+                _abs(current_l - prev_c)
             )
-            tr_values.append(tr)
+            tr_append(tr)
         except (ValueError, TypeError):
             continue
 